@@ -0,0 +1,116 @@
+"""
+Rough benchmarks for record decoding, encoding and memory use. Needs no API
+access; the rows are synthetic but shaped like real Leads rows.
+
+Usage: python benchmarks/records.py [row count]
+"""
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import fields
+from types import GenericAlias
+from typing import Any
+
+from zoho import Lead
+from zoho.records.base import AbstractRecord
+
+
+def lead_row(idx: int) -> dict:
+    user = {"id": "1000", "name": "Some Owner", "email": "owner@example.com"}
+    return {
+        "id": str(idx),
+        "Annual_Revenue": 1000.5,
+        "City": "Stockholm",
+        "Company": "Example School",
+        "Created_By": user,
+        "Created_Time": "2024-01-02T10:11:12+01:00",
+        "Description": None,
+        "Email": f"lead{idx}@example.com",
+        "Email_Opt_Out": False,
+        "First_Name": "Anna",
+        "Language": "Swedish",
+        "Last_Name": f"Lead {idx}",
+        "Lead_Status": "New lead",
+        "Modified_By": user,
+        "Modified_Time": "2024-03-02T10:11:12+01:00",
+        "No_of_Employees": 12,
+        "Organization_number": "556677-8899",
+        "Owner": user,
+        "Phone": "+46701234567",
+        "School_years": ["1", "2", "3"],
+        "Tag": [{"id": "2000", "name": "Some tag"}],
+        "Website": None,
+    }
+
+
+def legacy_from_dict(cls: type[AbstractRecord], data: dict[str, Any]) -> AbstractRecord:
+    """
+    AbstractRecord.from_dict() as it was before the per-class field codecs,
+    which resolved every field's type on every row. Kept here so the two can
+    be compared.
+    """
+    data = dict(data)
+    record_fields = fields(cls)
+    field_names = [f.name for f in record_fields]
+
+    for field in record_fields:
+        dict_key = cls.attrname_to_dict_key(field.name)
+        if dict_key in data:
+            if isinstance(field.type, GenericAlias) and field.type.__origin__ == list:
+                _type = cls.type_or_none(field.type.__args__[0])
+                if _type is not None and issubclass(_type, AbstractRecord) and isinstance(data[dict_key], list):
+                    data[field.name] = [legacy_from_dict(_type, row) for row in data[dict_key]]
+            else:
+                try:
+                    data[field.name] = cls.handle_input_field(field, data[dict_key])
+                except (ValueError, TypeError):
+                    del data[dict_key]
+
+    return cls(**{k: v for k, v in data.items() if k in field_names})
+
+
+def bench_decode(count: int):
+    rows = [lead_row(idx) for idx in range(count)]
+    start = time.perf_counter()
+    for row in rows:
+        legacy_from_dict(Lead, row).Email  # type: ignore  # pylint: disable=expression-not-assigned
+    elapsed = time.perf_counter() - start
+    print(f"Lead, legacy from_dict + Email: {count / elapsed:,.0f} rows/s")
+    for record_class in (Lead, Lead.lazy_class()):
+        start = time.perf_counter()
+        for row in rows:
+            record_class.from_dict(row).Email  # pylint: disable=expression-not-assigned
+        elapsed = time.perf_counter() - start
+        print(f"{record_class.__name__}.from_dict + Email: {count / elapsed:,.0f} rows/s")
+
+
+def bench_encode(count: int):
+    records = [Lead.from_dict(lead_row(idx)) for idx in range(count)]
+    start = time.perf_counter()
+    for record in records:
+        record.to_dict()
+    elapsed = time.perf_counter() - start
+    print(f"Lead.to_dict: {count / elapsed:,.0f} rows/s")
+
+
+def bench_memory(count: int):
+    for record_class in (Lead, Lead.compact_class(), Lead.lazy_class()):
+        tracemalloc.start()
+        # Round trip through JSON so that no strings are shared between rows,
+        # like with real API responses. The rows are traced too, since lazy
+        # records keep theirs alive; for the others, they are freed below.
+        rows = [json.loads(json.dumps(lead_row(idx))) for idx in range(count)]
+        records = [record_class.from_dict(row) for row in rows]
+        del rows
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        print(f"{record_class.__name__}: {size / len(records):,.0f} bytes/record")
+        del records
+
+
+if __name__ == "__main__":
+    row_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    bench_decode(row_count)
+    bench_encode(row_count)
+    bench_memory(row_count)
@@ -1,10 +1,11 @@
-from zoho.exceptions import ZohoHTTPError
+from zoho.exceptions import ZohoException, ZohoHTTPError
 from zoho.records.modules.account import Account, BaseAccount
 from zoho.records.modules.campaign import BaseCampaign, Campaign
 from zoho.records.modules.contact import BaseContact, Contact
 from zoho.records.modules.deal import BaseDeal, Deal
 from zoho.records.modules.lead import BaseLead, Lead
 from zoho.records.ref import UserRef
+from zoho.records.result import BulkResult
 from zoho.records.tag import Tag
 from zoho.requestor import ZohoRequestor
 from zoho.search import Search
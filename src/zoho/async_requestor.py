@@ -0,0 +1,242 @@
+import asyncio
+import logging
+from typing import Self
+
+import httpx
+
+from zoho.exceptions import ZohoHTTPError
+from zoho.json_codec import get_json_codec
+from zoho.oauth2 import ZohoOAuth2Token
+from zoho.ratelimit import RateLimiter, get_backoff_delay
+from zoho.requestor import (
+    IDEMPOTENT_METHODS,
+    HTTPMetod,
+    ZohoRequestor,
+    get_page_url,
+)
+from zoho.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncZohoRequestor:
+    """
+    Asyncio counterpart of ZohoRequestor. Requires the `httpx` package.
+
+    At most `max_concurrency` requests are in flight at any time. Requests
+    share the token and (by default) the RateLimiter of
+    ZohoRequestor.singleton().
+    """
+    _instance: Self
+    _client: httpx.AsyncClient | None = None
+    _loop: asyncio.AbstractEventLoop | None = None
+    _rate_limiter: RateLimiter | None = None
+
+    def __init__(self, max_concurrency: int | None = None):
+        self.max_concurrency = max_concurrency or settings.max_concurrency
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        self._check_loop()
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.pool_size,
+                    max_keepalive_connections=settings.pool_size,
+                ),
+                timeout=settings.request_timeout,
+            )
+        return self._client
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """
+        By default the same one as ZohoRequestor.singleton()'s, so that sync
+        and async callers share one credit budget, and a 429 pauses them
+        all.
+        """
+        if self._rate_limiter is None:
+            self._rate_limiter = ZohoRequestor.singleton().rate_limiter
+        return self._rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, value: RateLimiter):
+        self._rate_limiter = value
+
+    @classmethod
+    def singleton(cls):
+        if not hasattr(cls, "_instance"):
+            cls._instance = cls()
+        return cls._instance
+
+    def _check_loop(self):
+        """
+        The client and semaphore are bound to the event loop they are
+        first used in, so they are replaced when running in another loop
+        (like on a second asyncio.run()). The old client's connections
+        belong to the old loop and cannot be closed from this one.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._client = None
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        self._check_loop()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def delete(self, url: str, timeout: float | None = None) -> dict:
+        return await self.request(url=url, method=HTTPMetod.DELETE, timeout=timeout)
+
+    async def get(self, url: str, timeout: float | None = None, headers: dict[str, str] | None = None) -> dict:
+        return await self.request(url=url, method=HTTPMetod.GET, timeout=timeout, headers=headers)
+
+    async def get_list(
+        self,
+        url: str,
+        list_field: str,
+        get_params: dict | None = None,
+        per_page: int | None = None,
+        limit: int | None = None,
+        use_page_tokens: bool = True,
+        timeout: float | None = None,
+    ) -> list[dict]:
+        limit = limit or settings.list_limit
+        more_items = True
+        next_page_token = None
+        page = 1
+        items: list[dict] = []
+
+        while more_items:
+            page_url = get_page_url(
+                url=url,
+                get_params=get_params,
+                page=page,
+                next_page_token=next_page_token if use_page_tokens else None,
+                per_page=per_page,
+            )
+            response = await self.get(url=page_url, timeout=timeout)
+            items.extend(response.get(list_field, [])[:limit - len(items)])
+            info = response.get("info", {})
+            more_items = info.get("more_records", False) and len(items) < limit
+            next_page_token = info.get("next_page_token", None)
+            page += 1
+
+        return items
+
+    async def get_token(self) -> ZohoOAuth2Token:
+        """
+        ZohoRequestor.singleton()'s token, so it is refreshed ahead of expiry
+        in the background and shared through settings.token_store the same
+        way. Only if it has actually expired do we wait for the refresh,
+        which then runs in a worker thread so as not to block the event
+        loop (and concurrent callers still only trigger one).
+        """
+        requestor = ZohoRequestor.singleton()
+        token = requestor.get_valid_token()
+        if token is None:
+            token = await asyncio.to_thread(lambda: requestor.token)
+        return token
+
+    async def post(
+        self,
+        url: str,
+        json: dict | None = None,
+        timeout: float | None = None,
+        retry: bool = False,
+        cost: float = 1,
+    ) -> dict:
+        return await self.request(
+            url=url,
+            method=HTTPMetod.POST,
+            json=json or {},
+            timeout=timeout,
+            retry=retry,
+            cost=cost,
+        )
+
+    async def put(self, url: str, json: dict | None = None, timeout: float | None = None, cost: float = 1) -> dict:
+        return await self.request(url=url, method=HTTPMetod.PUT, json=json or {}, timeout=timeout, cost=cost)
+
+    async def request(
+        self,
+        url: str,
+        method: HTTPMetod,
+        json: dict | None = None,
+        timeout: float | None = None,
+        retry: bool | None = None,
+        headers: dict[str, str] | None = None,
+        cost: float = 1,
+    ) -> dict:
+        """
+        Retries like ZohoRequestor.request(), and goes through the same rate
+        limiter.
+        """
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        body = get_json_codec().dumps(json) if json is not None else None
+        if body is not None:
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        rate_limited = 0
+        retries = 0
+
+        while True:
+            token = await self.get_token()
+            try:
+                async with self.rate_limiter.aacquire(cost), self._semaphore:
+                    response = await self.client.request(
+                        method=method.value,
+                        url=url,
+                        headers={"Authorization": f"{token.token_type} {token.access_token}", **(headers or {})},
+                        content=body,
+                        timeout=timeout or settings.request_timeout,
+                    )
+            except httpx.TransportError as e:
+                if not retry or retries >= settings.max_retries:
+                    raise
+                retries += 1
+                delay = get_backoff_delay(retries)
+                logger.warning("%s %s: %s; retrying in %.1f s", method.name, url, e, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            # On 429, this makes all callers wait for as long as the server
+            # says (in aacquire() for this one):
+            self.rate_limiter.update(response.status_code, response.headers)
+            if response.status_code == 429 and rate_limited < settings.rate_limit_retries:
+                rate_limited += 1
+                continue
+            if response.status_code >= 500 and retry and retries < settings.max_retries:
+                retries += 1
+                delay = get_backoff_delay(retries)
+                logger.warning("%s %s: %d; retrying in %.1f s", method.name, url, response.status_code, delay)
+                await asyncio.sleep(delay)
+                continue
+            break
+
+        logger.info(
+            "%s %s: %d%s, %d bytes",
+            method.name,
+            url,
+            response.status_code,
+            f" {response.reason_phrase}" if response.reason_phrase else "",
+            len(response.content),
+        )
+        if json:
+            logger.debug("json=%s", json)
+        ZohoHTTPError.raise_for_status(response)  # type: ignore
+
+        if response.status_code in (204, 304):
+            return {}
+        return get_json_codec().loads(response.content)
@@ -0,0 +1,242 @@
+import csv
+import io
+import logging
+import tempfile
+import time
+import zipfile
+from contextlib import contextmanager
+from typing import IO, Any, Callable, Iterator
+from urllib.parse import urljoin
+
+from zoho.exceptions import ZohoBulkJobError, ZohoException
+from zoho.ratelimit import BULK_READ_COST, BULK_WRITE_COST
+from zoho.records.base import AbstractRecord, FieldCodec
+from zoho.requestor import ZohoRequestor
+from zoho.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Max number of rows in one Bulk Write job:
+BULK_WRITE_MAX_ROWS = 25_000
+
+
+def _get_csv_value_converter(codec: FieldCodec) -> Callable[[str], Any]:
+    _type = codec.type
+
+    if codec.is_record_list:
+        assert _type is not None and issubclass(_type, AbstractRecord)
+        # Multi-value lookups are exported by name (e.g. Tag) or by id:
+        item_key = "name" if "name" in _type.dict_keys() else "id"
+        return lambda value: [{"id": None, item_key: item} for item in value.split(";")] if value else []
+    if codec.is_list:
+        return lambda value: value.split(";") if value else []
+    if _type is not None and issubclass(_type, AbstractRecord):
+        # Lookups only come with their id:
+        empty_ref = dict.fromkeys(_type.dict_keys())
+        return lambda value: {**empty_ref, "id": value} if value else None
+    if _type is not None and issubclass(_type, bool):
+        return lambda value: value.lower() == "true" if value else None
+    return lambda value: value or None
+
+
+def _to_csv_value(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, dict):
+        # Lookups are written by id:
+        return value.get("id", None) or ""
+    if isinstance(value, list):
+        return ";".join(_to_csv_value(v) for v in value)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def create_read_job(module: str, fields: list[str], criteria: dict | None = None, page: int = 1) -> str:
+    """Returns the job id."""
+    query: dict[str, Any] = {"module": {"api_name": module}, "fields": fields, "page": page}
+    if criteria:
+        query["criteria"] = criteria
+    response = ZohoRequestor.singleton().post(
+        url=get_bulk_url("read"),
+        json={"query": query, "file_type": "csv"},
+        cost=BULK_READ_COST,
+    )
+    return response["data"][0]["details"]["id"]
+
+
+def create_write_job(
+    module: str,
+    file_id: str,
+    columns: list[str],
+    lookup_columns: set[str],
+    operation: str = "upsert",
+    find_by: str | None = None,
+) -> str:
+    """Returns the job id."""
+    field_mappings: list[dict[str, Any]] = []
+    for idx, column in enumerate(columns):
+        mapping: dict[str, Any] = {"api_name": column, "index": idx}
+        if column in lookup_columns:
+            mapping["find_by"] = "id"
+        field_mappings.append(mapping)
+    resource: dict[str, Any] = {
+        "type": "data",
+        "module": {"api_name": module},
+        "file_id": file_id,
+        "field_mappings": field_mappings,
+    }
+    if find_by:
+        resource["find_by"] = find_by
+    response = ZohoRequestor.singleton().post(
+        url=get_bulk_url("write"),
+        json={"operation": operation, "ignore_empty": True, "resource": [resource]},
+        cost=BULK_WRITE_COST,
+    )
+    return response["details"]["id"]
+
+
+def download_result(job: dict) -> IO[bytes]:
+    """Downloads the zipped result file of a completed job."""
+    url = urljoin(ZohoRequestor.singleton().token.api_domain, job["result"]["download_url"])
+    return ZohoRequestor.singleton().download(url)
+
+
+def get_bulk_url(operation: str, job_id: str | None = None) -> str:
+    url = f"{ZohoRequestor.singleton().token.api_domain}/crm/bulk/v5/{operation}"
+    return f"{url}/{job_id}" if job_id else url
+
+
+def get_csv_converter(record_class: type[AbstractRecord]) -> Callable[[dict[str, str]], dict[str, Any]]:
+    """
+    Returns a function that converts a Bulk API CSV row into a dict that
+    record_class.from_dict() accepts: empty values become None, booleans are
+    parsed, lookups become dicts with only the id set, and multi-value fields
+    are split on ";". Columns that are not init fields of the class are left
+    out.
+    """
+    converters: dict[str, tuple[str, Callable[[str], Any]]] = {}
+
+    for codec in record_class.get_field_codecs():
+        if codec.field.init:
+            converters[codec.dict_key] = (codec.dict_key, _get_csv_value_converter(codec))
+    if "id" in converters:
+        # The CSV header has "Id" rather than "id":
+        converters["Id"] = converters["id"]
+
+    def convert(row: dict[str, str]) -> dict[str, Any]:
+        data: dict[str, Any] = {}
+        for column, value in row.items():
+            converter = converters.get(column)
+            if converter is not None:
+                data[converter[0]] = converter[1](value)
+        return data
+
+    return convert
+
+
+def get_upload_url() -> str:
+    if settings.upload_url:
+        return settings.upload_url
+    # E.g. https://www.zohoapis.eu -> https://content.zohoapis.eu
+    api_domain = ZohoRequestor.singleton().token.api_domain
+    return f"{api_domain.replace('://www.', '://content.', 1)}/crm/v5/upload"
+
+
+def iter_csv_rows(file: IO[bytes]) -> Iterator[dict[str, str]]:
+    """
+    Reads the CSV file in the zip archive `file` one row at a time, without
+    extracting it first.
+    """
+    with zipfile.ZipFile(file) as archive:
+        name = next((n for n in archive.namelist() if n.lower().endswith(".csv")), None)
+        if name is None:
+            raise ZohoException(f"No CSV file in bulk result archive (files: {archive.namelist()})")
+        with archive.open(name) as raw, io.TextIOWrapper(raw, encoding="utf-8-sig", newline="") as text:
+            yield from csv.DictReader(text)
+
+
+def wait_for_job(operation: str, job_id: str) -> dict:
+    """
+    Polls the job until it is completed and returns its details. The polling
+    interval starts at settings.bulk_poll_interval and doubles up to
+    settings.bulk_poll_interval_max.
+    """
+    url = get_bulk_url(operation, job_id)
+    interval = settings.bulk_poll_interval
+
+    while True:
+        response = ZohoRequestor.singleton().get(url=url)
+        # Read jobs are wrapped in "data", write jobs are not:
+        job = response["data"][0] if "data" in response else response
+        state = job.get("state", None) or job.get("status", None)
+        if state == "COMPLETED":
+            return job
+        if state in ("FAILURE", "FAILED"):
+            raise ZohoBulkJobError(job)
+        logger.info("Bulk %s job %s is %s, checking again in %.1f s", operation, job_id, state, interval)
+        time.sleep(interval)
+        interval = min(interval * 2, settings.bulk_poll_interval_max)
+
+
+def run_write_job(
+    module: str,
+    record_class: type[AbstractRecord],
+    rows: list[dict[str, Any]],
+    operation: str = "upsert",
+    find_by: str | None = None,
+) -> list[dict[str, str]]:
+    """
+    Uploads `rows` (as output by record_class.to_dict()) as a zipped CSV,
+    runs a Bulk Write job on them, and returns the rows of the job's result
+    file, which are in the same order as `rows`. Nested record lists (e.g.
+    Tag) are not supported by the API and are left out, whatever their
+    values.
+    """
+    codecs = {codec.dict_key: codec for codec in record_class.get_output_codecs()}
+    columns: dict[str, None] = {}
+    lookup_columns: set[str] = set()
+    for row in rows:
+        for key in row:
+            codec = codecs.get(key)
+            if codec is None or codec.is_record_list:
+                continue
+            columns[key] = None
+            if codec.type is not None and issubclass(codec.type, AbstractRecord):
+                lookup_columns.add(key)
+
+    if not settings.org_id:
+        raise ValueError("settings.org_id must be set.")
+
+    with write_csv_zip(rows, list(columns)) as file:
+        response = ZohoRequestor.singleton().upload(
+            get_upload_url(),
+            file,
+            f"{module}.zip",
+            headers={"feature": "bulk-write", "X-CRM-ORG": settings.org_id},
+        )
+    file_id = response["details"]["file_id"]
+
+    job = wait_for_job("write", create_write_job(module, file_id, list(columns), lookup_columns, operation, find_by))
+    with download_result(job) as file:
+        return list(iter_csv_rows(file))
+
+
+@contextmanager
+def write_csv_zip(rows: list[dict[str, Any]], columns: list[str]) -> Iterator[IO[bytes]]:
+    """
+    Writes `rows` as a CSV file inside a zip archive, in a temporary file
+    that is kept in memory up to settings.download_spool_size bytes. Yields
+    the file rewound, and closes it on exit.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=settings.download_spool_size) as file:
+        with zipfile.ZipFile(file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            with archive.open("data.csv", "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as text:
+                writer = csv.writer(text)
+                writer.writerow(columns)
+                for row in rows:
+                    writer.writerow([_to_csv_value(row.get(column, None)) for column in columns])
+
+        file.seek(0)
+        yield file  # type: ignore
@@ -0,0 +1,173 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from copy import deepcopy
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class RecordCache(ABC):
+    """
+    Cache for raw record dicts, as returned by the API, keyed on module and
+    record id. Records are decoded anew on every hit, so cached data cannot
+    be modified through the returned objects.
+
+    To enable, set zoho.settings.record_cache to an instance of a subclass.
+    AbstractModuleRecord.get() then uses it, and update(), bulk_update(),
+    bulk_upsert() etc. invalidate the entries of the records they write.
+
+    `stats` counts hits and misses for this instance (i.e. this process).
+
+    @param max_size Max number of records; when exceeded, the least
+    recently used ones are evicted.
+    @param ttl Seconds before an entry expires. None means never.
+    """
+    def __init__(self, max_size: int = 10_000, ttl: float | None = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+    def _get_expires(self) -> float | None:
+        return time.time() + self.ttl if self.ttl is not None else None
+
+    @abstractmethod
+    def _get(self, module: str, record_id: str) -> dict[str, Any] | None:
+        ...
+
+    @abstractmethod
+    def _set(self, module: str, record_id: str, data: dict[str, Any]) -> int:
+        """Returns the number of evicted entries."""
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def delete(self, module: str, record_id: str):
+        ...
+
+    def get(self, module: str, record_id: str) -> dict[str, Any] | None:
+        data = self._get(module, record_id)
+        if data is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return data
+
+    def set(self, module: str, record_id: str, data: dict[str, Any]):
+        self.stats.evictions += self._set(module, record_id, data)
+
+
+class MemoryRecordCache(RecordCache):
+    """In-process LRU cache."""
+    def __init__(self, max_size: int = 10_000, ttl: float | None = 300.0):
+        super().__init__(max_size=max_size, ttl=ttl)
+        self._entries: OrderedDict[tuple[str, str], tuple[float | None, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, module: str, record_id: str) -> dict[str, Any] | None:
+        key = (module, record_id)
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return None
+            if entry[0] is not None and entry[0] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return deepcopy(entry[1])
+
+    def _set(self, module: str, record_id: str, data: dict[str, Any]) -> int:
+        key = (module, record_id)
+        evicted = 0
+        with self._lock:
+            self._entries[key] = (self._get_expires(), deepcopy(data))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def delete(self, module: str, record_id: str):
+        with self._lock:
+            self._entries.pop((module, record_id), None)
+
+
+class SQLiteRecordCache(RecordCache):
+    """
+    LRU cache in an SQLite database file, which may be shared by several
+    processes.
+    """
+    def __init__(self, path: str, max_size: int = 10_000, ttl: float | None = 300.0):
+        super().__init__(max_size=max_size, ttl=ttl)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS records ("
+            "module TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL, expires REAL, accessed REAL NOT NULL, "
+            "PRIMARY KEY (module, id))"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS records_accessed ON records (accessed)")
+
+    def _get(self, module: str, record_id: str) -> dict[str, Any] | None:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data, expires FROM records WHERE module = ? AND id = ?",
+                (module, record_id),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] is not None and row[1] < now:
+                self._connection.execute("DELETE FROM records WHERE module = ? AND id = ?", (module, record_id))
+                return None
+            self._connection.execute(
+                "UPDATE records SET accessed = ? WHERE module = ? AND id = ?",
+                (now, module, record_id),
+            )
+        return json.loads(row[0])
+
+    def _set(self, module: str, record_id: str, data: dict[str, Any]) -> int:
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO records (module, id, data, expires, accessed) VALUES (?, ?, ?, ?, ?)",
+                (module, record_id, json.dumps(data), self._get_expires(), time.time()),
+            )
+            cursor = self._connection.execute(
+                "DELETE FROM records WHERE rowid IN "
+                "(SELECT rowid FROM records ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_size,),
+            )
+        return max(cursor.rowcount, 0)
+
+    def clear(self):
+        with self._lock:
+            self._connection.execute("DELETE FROM records")
+
+    def close(self):
+        self._connection.close()
+
+    def delete(self, module: str, record_id: str):
+        with self._lock:
+            self._connection.execute("DELETE FROM records WHERE module = ? AND id = ?", (module, record_id))
@@ -0,0 +1,125 @@
+import datetime
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Iterable
+
+import numpy as np
+
+from zoho.records.base import AbstractRecord, FieldCodec
+
+
+if TYPE_CHECKING:
+    import pandas
+
+
+class RecordColumns:
+    """
+    Column-oriented result set, built straight from raw API rows without
+    creating a record object per row. Requires `numpy` (and `pandas` for
+    to_pandas()).
+
+    Column dtypes come from the record class's field annotations:
+    - int: int64, or float64 with NaN if any value is missing
+    - float, Decimal: float64 with NaN for missing values
+    - bool: bool, or object if any value is missing
+    - datetime: datetime64[s] in UTC, NaT for missing values
+    - date: datetime64[D], NaT for missing values
+    - records (e.g. UserRef): object array of their ids
+    - everything else: object array of the raw values
+    """
+    def __init__(self, record_class: type[AbstractRecord], fields: list[str] | None = None):
+        self.record_class = record_class
+        codecs = record_class.get_field_codecs()
+        self.codecs: dict[str, FieldCodec] = {
+            c.dict_key: c for c in codecs if fields is None or c.dict_key in fields or c.dict_key == "id"
+        }
+        self._values: dict[str, list[Any]] = {key: [] for key in self.codecs}
+        self._arrays: dict[str, np.ndarray] = {}
+        self._length = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.codecs
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        if key not in self._arrays:
+            self._arrays[key] = self._to_array(self.codecs[key], self._values[key])
+        return self._arrays[key]
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__}: {self.record_class.__name__}, {len(self)} rows>"
+
+    @staticmethod
+    def _to_array(codec: FieldCodec, values: list[Any]) -> np.ndarray:
+        _type = codec.type
+        has_missing = any(v is None for v in values)
+
+        if codec.is_list or _type is None:
+            return _object_array(values)
+        if issubclass(_type, AbstractRecord):
+            return _object_array([v.get("id") if isinstance(v, dict) else v for v in values])
+        if issubclass(_type, bool):
+            if has_missing:
+                return _object_array(values)
+            return np.array(values, dtype=bool)
+        if issubclass(_type, int) and not has_missing:
+            return np.array(values, dtype=np.int64)
+        if issubclass(_type, (int, float, Decimal)):
+            return np.array([_float(v) for v in values], dtype=np.float64)
+        if issubclass(_type, datetime.datetime):
+            return np.array([_utc_datetime(v) for v in values], dtype="datetime64[s]")
+        if issubclass(_type, datetime.date):
+            return np.array([_date(v) for v in values], dtype="datetime64[D]")
+        return _object_array(values)
+
+    def append_rows(self, rows: Iterable[dict[str, Any]]):
+        for row in rows:
+            for key, values in self._values.items():
+                values.append(row.get(key))
+            self._length += 1
+        self._arrays.clear()
+
+    def keys(self) -> list[str]:
+        return list(self.codecs)
+
+    def to_dict(self) -> dict[str, np.ndarray]:
+        return {key: self[key] for key in self.codecs}
+
+    def to_pandas(self) -> "pandas.DataFrame":
+        import pandas
+
+        return pandas.DataFrame(self.to_dict())
+
+
+# The converters below treat values they cannot parse as missing, just like
+# AbstractRecord.from_dict() leaves them out.
+def _date(value: Any) -> datetime.date | None:
+    try:
+        return datetime.date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _object_array(values: list[Any]) -> np.ndarray:
+    # np.array() would try to turn lists of lists into 2D arrays.
+    array: np.ndarray = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def _utc_datetime(value: Any) -> datetime.datetime | None:
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
@@ -0,0 +1,194 @@
+from dataclasses import MISSING
+from typing import TYPE_CHECKING, Any, Generic, Iterator, Self, TypeVar
+
+from klaatu_python.utils import partition
+
+from zoho.ratelimit import get_coql_cost
+from zoho.records.base import AbstractRecord
+from zoho.requestor import ZohoRequestor
+from zoho.search import BetweenCriterion, Criterion, InCriterion, Search
+from zoho.settings import settings
+from zoho.utils import iter_merged_pages_by_id
+
+
+if TYPE_CHECKING:
+    from zoho.records.modules.base import AbstractModuleRecord
+
+
+_R = TypeVar("_R", bound="AbstractModuleRecord")
+
+# Search operator -> COQL operator, for the ones that take a single value:
+COQL_OPERATORS = {
+    "equals": "=",
+    "not_equal": "!=",
+    "greater_than": ">",
+    "greater_equal": ">=",
+    "less_than": "<",
+    "less_equal": "<=",
+}
+
+# API maximums:
+COQL_MAX_FIELDS = 50
+COQL_MAX_PAGE_SIZE = 2000
+
+
+def format_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return str(value)
+    if hasattr(value, "isoformat"):
+        value = value.isoformat()
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def format_criterion(criterion: Criterion) -> str:
+    if isinstance(criterion, InCriterion):
+        return f"{criterion.key} in ({', '.join(format_value(v) for v in criterion.value)})"
+    if isinstance(criterion, BetweenCriterion):
+        return f"{criterion.key} between {format_value(criterion.value[0])} and {format_value(criterion.value[1])}"
+    if criterion.value is None and criterion.operator in ("equals", "not_equal"):
+        return f"{criterion.key} {'is null' if criterion.operator == 'equals' else 'is not null'}"
+    if criterion.operator == "starts_with":
+        return f"{criterion.key} like {format_value(str(criterion.value) + '%')}"
+    if criterion.operator in COQL_OPERATORS:
+        return f"{criterion.key} {COQL_OPERATORS[criterion.operator]} {format_value(criterion.value)}"
+    raise ValueError(f"Unsupported search operator: {criterion.operator}")
+
+
+class Query(Generic[_R]):
+    """
+    COQL query builder for one module. Methods return the query itself, so
+    they can be chained:
+
+        Lead.query("Email", "Lead_Status")
+            .where(Search().eq(Lead_Status="Ny").gt(Created_Time=since))
+            .order_by("-Created_Time")
+            .limit(5000)
+            .all()
+
+    `id` and the record class's required fields are always selected. Queries
+    with more than 50 fields (the API maximum) are run in partitions which
+    are merged on record id, just like list() does.
+
+    Results are fetched in pages of up to 2000 records. The limit defaults
+    to settings.list_limit, like for list().
+    """
+    def __init__(self, record_class: type[_R], fields: list[str] | None = None):
+        self.record_class = record_class
+        self._fields = fields or []
+        self._criteria: list[Criterion] = []
+        self._order_by: list[str] = []
+        self._limit: int | None = None
+        self._offset = 0
+
+    def __str__(self) -> str:
+        return self.to_coql()
+
+    def _get_fields(self) -> list[str]:
+        codecs = [codec for codec in self.record_class.get_field_codecs() if codec.field.init]
+        required = [
+            codec.dict_key
+            for codec in codecs
+            if codec.field.default is MISSING and codec.field.default_factory is MISSING
+        ]
+        return list(dict.fromkeys(["id", *required, *(self._fields or [codec.dict_key for codec in codecs])]))
+
+    def _iter_pages(self, fields: list[str]) -> Iterator[list[dict]]:
+        url = f"{ZohoRequestor.singleton().token.api_domain}/crm/v5/coql"
+        limit = self._limit or settings.list_limit
+        offset = self._offset
+        count = 0
+
+        while count < limit:
+            page_size = min(limit - count, COQL_MAX_PAGE_SIZE)
+            response = ZohoRequestor.singleton().post(
+                url=url,
+                json={"select_query": self.to_coql(fields=fields, limit=page_size, offset=offset)},
+                # It's a read, so retrying is safe:
+                retry=True,
+                cost=get_coql_cost(page_size),
+            )
+            rows = response.get("data", [])
+            if rows:
+                yield rows
+            count += len(rows)
+            offset += len(rows)
+            if not rows or not response.get("info", {}).get("more_records", False):
+                break
+
+    def all(self) -> list[_R]:
+        return list(self.iter())
+
+    def iter(self) -> Iterator[_R]:
+        # Lookups only come with their id, so the other keys of their record
+        # classes are filled in, to keep from_dict() from failing on them:
+        empty_refs = {
+            codec.dict_key: dict.fromkeys(codec.type.dict_keys())
+            for codec in self.record_class.get_field_codecs()
+            if not codec.is_list and codec.type is not None and issubclass(codec.type, AbstractRecord)
+        }
+        for rows in self.iter_rows():
+            for row in rows:
+                for key, empty_ref in empty_refs.items():
+                    if isinstance(row.get(key, None), dict):
+                        row[key] = {**empty_ref, **row[key]}
+                yield self.record_class.from_dict(row)
+
+    def iter_rows(self) -> Iterator[list[dict]]:
+        """Yields pages of raw row dicts."""
+        fields = self._get_fields()
+        if len(fields) <= COQL_MAX_FIELDS:
+            yield from self._iter_pages(fields)
+        else:
+            # Every partition must include the id, and have the same order:
+            field_lists = [["id", *field_list] for field_list in partition(fields[1:], COQL_MAX_FIELDS - 1)]
+            yield from iter_merged_pages_by_id([self._iter_pages(field_list) for field_list in field_lists])
+
+    def limit(self, limit: int) -> Self:
+        self._limit = limit
+        return self
+
+    def offset(self, offset: int) -> Self:
+        self._offset = offset
+        return self
+
+    def order_by(self, *fields: str) -> Self:
+        """Prefix field names with "-" for descending order."""
+        self._order_by.extend(fields)
+        return self
+
+    def select(self, *fields: str) -> Self:
+        self._fields.extend(fields)
+        return self
+
+    def to_coql(self, fields: list[str] | None = None, limit: int | None = None, offset: int | None = None) -> str:
+        fields = fields or self._get_fields()
+        if self._criteria:
+            where = format_criterion(self._criteria[0])
+            # With more than one condition, they must be grouped in pairs:
+            for criterion in self._criteria[1:]:
+                where = f"({where} and {format_criterion(criterion)})"
+        else:
+            # The where clause is mandatory:
+            where = "id is not null"
+        # The id is added as a tiebreaker, so pagination is stable:
+        order_by = self._order_by if "id" in [f.lstrip("-") for f in self._order_by] else [*self._order_by, "id"]
+        order = ", ".join(f"{f[1:]} desc" if f.startswith("-") else f"{f} asc" for f in order_by)
+        limit = limit or min(self._limit or settings.list_limit, COQL_MAX_PAGE_SIZE)
+        offset = self._offset if offset is None else offset
+
+        return (
+            f"select {', '.join(fields)} from {self.record_class.module} "
+            f"where {where} order by {order} limit {offset}, {limit}"
+        )
+
+    def where(self, search: Search | None = None, **kwargs) -> Self:
+        """
+        Same criteria as for list(). Calling it again adds to the existing
+        criteria.
+        """
+        search = self.record_class._get_search(search, **kwargs)  # pylint: disable=protected-access
+        if search:
+            self._criteria.extend(search.criteria)
+        return self
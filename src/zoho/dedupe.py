@@ -0,0 +1,270 @@
+import datetime
+import logging
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Generic, Iterable, TypeVar
+
+from klaatu_python.utils import partition
+
+from zoho.records.modules.base import AbstractModuleRecord
+from zoho.records.result import BulkResult
+
+
+logger = logging.getLogger(__name__)
+
+_R = TypeVar("_R", bound=AbstractModuleRecord)
+
+
+def normalize_company(value: Any) -> str | None:
+    """Case-folded, with everything but letters and digits removed."""
+    if not isinstance(value, str):
+        return None
+    return "".join(c for c in value.casefold() if c.isalnum()) or None
+
+
+def normalize_digits(value: Any) -> str | None:
+    if not isinstance(value, str):
+        return None
+    return re.sub(r"\D", "", value) or None
+
+
+def normalize_email(value: Any) -> str | None:
+    if not isinstance(value, str) or "@" not in value:
+        return None
+    return value.strip().casefold()
+
+
+def normalize_phone(value: Any) -> str | None:
+    """
+    The last 9 digits, so that country codes and trunk prefixes (like in
+    +46 70 123 45 67 and 070-123 45 67) don't matter. Numbers with fewer
+    than 6 digits are ignored.
+    """
+    digits = normalize_digits(value)
+    if digits is None or len(digits) < 6:
+        return None
+    return digits[-9:]
+
+
+@dataclass
+class BlockingKey:
+    """
+    Records that get the same normalized value for any of `fields` agree on
+    this key. E.g. with fields ["Email", "Secondary_Email"], one record's
+    Email may match another's Secondary_Email.
+
+    @param sufficient Whether agreeing on this key alone makes two records
+    duplicates. Keys that are not (like company name or phone number,
+    which are often shared by different people) need to be backed by at
+    least one other agreeing key.
+    """
+    name: str
+    fields: list[str]
+    normalize: Callable[[Any], str | None]
+    sufficient: bool = True
+
+
+DEFAULT_BLOCKING_KEYS = [
+    BlockingKey("email", ["Email", "Secondary_Email"], normalize_email),
+    BlockingKey("organization_number", ["Organization_number"], normalize_digits),
+    BlockingKey("company", ["Company"], normalize_company, sufficient=False),
+    BlockingKey("phone", ["Phone", "Mobile"], normalize_phone, sufficient=False),
+]
+
+
+@dataclass
+class DedupeResult(Generic[_R]):
+    """
+    `survivors` are the merged records to update, and `losers` the ones to
+    delete; `groups` are the duplicate groups, with the survivor first.
+    """
+    groups: list[list[_R]] = field(default_factory=list)
+
+    @property
+    def losers(self) -> list[_R]:
+        return [record for group in self.groups for record in group[1:]]
+
+    @property
+    def survivors(self) -> list[_R]:
+        return [group[0] for group in self.groups]
+
+    def apply(self, record_class: type[_R]) -> tuple[list[BulkResult[_R]], list[BulkResult[_R]]]:
+        """
+        Updates the survivors, and then deletes the losers of the groups
+        whose survivor was successfully updated. Returns the update and
+        delete results.
+        """
+        update_results = record_class.bulk_update(self.survivors)
+        updated_ids = {result.record.id for result in update_results if result.ok}
+        losers = [record for group in self.groups if group[0].id in updated_ids for record in group[1:]]
+        delete_results = record_class.bulk_delete(losers) if losers else []
+        return update_results, delete_results
+
+    def delete_batches(self, size: int = 100) -> list[list[_R]]:
+        return list(partition(self.losers, size))
+
+    def update_batches(self, size: int = 100) -> list[list[_R]]:
+        return list(partition(self.survivors, size))
+
+
+class Deduper(Generic[_R]):
+    """
+    Finds and merges duplicate records of a module.
+
+    Instead of comparing every record with every other, each record's
+    blocking keys are normalized and indexed, and only records sharing a
+    key are compared. Two records are duplicates if they agree on a
+    sufficient key (email or organization number), or on at least two
+    other keys (like company name and phone number); never on company name
+    or phone number alone. Duplicates are joined with union-find, and are
+    transitive: if A shares an email with B, and B a company name and phone
+    number with C, all three end up in one group.
+
+    Each group is folded into its survivor (by default the oldest record)
+    using the record's merge_with(), if it has one (like Lead, which also
+    applies the lead_status_prio rules), or else by filling the survivor's
+    empty mergeable_fields from the others.
+
+    Usage:
+        deduper = Deduper(Lead)
+        result = deduper.run(Lead.list(limit=100_000))
+        update_results, delete_results = result.apply(Lead)
+
+    @param keys Blocking keys to use. Defaults to those of
+    DEFAULT_BLOCKING_KEYS whose fields the record class has.
+    @param max_block_size Values of insufficient keys shared by more
+    records than this (like a placeholder company name or a switchboard
+    number) are too unspecific to mean anything, and are ignored. Records
+    agreeing on a sufficient key are always duplicates, however many they
+    are.
+    @param survivor_key Sort key for the records of a group; the first one
+    survives.
+    """
+    def __init__(
+        self,
+        record_class: type[_R],
+        keys: list[BlockingKey] | None = None,
+        max_block_size: int = 50,
+        survivor_key: Callable[[_R], Any] | None = None,
+    ):
+        if not hasattr(record_class, "mergeable_fields"):
+            raise TypeError(f"{record_class.__name__} has no mergeable_fields")
+        self.record_class = record_class
+        self.max_block_size = max_block_size
+        self.survivor_key = survivor_key or self._get_default_survivor_key
+        if keys is None:
+            dict_keys = record_class.dict_keys()
+            keys = [
+                BlockingKey(key.name, [f for f in key.fields if f in dict_keys], key.normalize, key.sufficient)
+                for key in DEFAULT_BLOCKING_KEYS
+            ]
+            keys = [key for key in keys if key.fields]
+        self.keys = keys
+
+    @staticmethod
+    def _get_default_survivor_key(record: _R) -> tuple[datetime.datetime, str]:
+        created_time = getattr(record, "Created_Time", None)
+        if not isinstance(created_time, datetime.datetime):
+            created_time = datetime.datetime.max.replace(tzinfo=datetime.timezone.utc)
+        return created_time, record.id or ""
+
+    def _is_match(self, values: dict[str, set[str]], other_values: dict[str, set[str]]) -> bool:
+        agreeing = 0
+        for key in self.keys:
+            if values[key.name] & other_values[key.name]:
+                if key.sufficient:
+                    return True
+                agreeing += 1
+        return agreeing >= 2
+
+    @staticmethod
+    def _merge(survivor: _R, other: _R):
+        merge_with = getattr(survivor, "merge_with", None)
+        if merge_with is not None:
+            merge_with(other)
+            return
+        for f in getattr(survivor, "mergeable_fields"):
+            if getattr(other, f) and not getattr(survivor, f):
+                setattr(survivor, f, getattr(other, f))
+        for other_tag in getattr(other, "Tag", []):
+            if other_tag not in survivor.Tag:
+                survivor.Tag.append(other_tag)
+
+    def find_groups(self, records: Iterable[_R]) -> list[list[_R]]:
+        """
+        Returns the groups of 2 or more records that are duplicates of each
+        other, directly or through other records. Records without an id are
+        skipped.
+        """
+        records = [record for record in records if record.id]
+        key_values: list[dict[str, set[str]]] = []
+        parents = list(range(len(records)))
+        sizes = [1] * len(records)
+        blocks: dict[tuple[str, str], list[int]] = defaultdict(list)
+
+        def find(idx: int) -> int:
+            while parents[idx] != idx:
+                parents[idx] = parents[parents[idx]]
+                idx = parents[idx]
+            return idx
+
+        def union(a: int, b: int):
+            a, b = find(a), find(b)
+            if a != b:
+                if sizes[a] < sizes[b]:
+                    a, b = b, a
+                parents[b] = a
+                sizes[a] += sizes[b]
+
+        for idx, record in enumerate(records):
+            key_values.append({})
+            for key in self.keys:
+                values = {key.normalize(getattr(record, f, None)) for f in key.fields}
+                key_values[idx][key.name] = {value for value in values if value is not None}
+                for value in key_values[idx][key.name]:
+                    blocks[(key.name, value)].append(idx)
+
+        sufficient = {key.name for key in self.keys if key.sufficient}
+
+        for (key_name, value), indices in blocks.items():
+            if key_name in sufficient:
+                # All of them match, so no need to compare them pairwise:
+                for other_idx in indices[1:]:
+                    union(indices[0], other_idx)
+                continue
+            # Other blocks only give the candidates; each pair in them still
+            # has to match:
+            if len(indices) > self.max_block_size:
+                logger.info("Ignoring %s %r, shared by %d records", key_name, value, len(indices))
+                continue
+            for pos, idx in enumerate(indices):
+                for other_idx in indices[pos + 1:]:
+                    if find(idx) != find(other_idx) and self._is_match(key_values[idx], key_values[other_idx]):
+                        union(idx, other_idx)
+
+        groups: dict[int, list[_R]] = defaultdict(list)
+        for idx, record in enumerate(records):
+            groups[find(idx)].append(record)
+
+        return [group for group in groups.values() if len(group) > 1]
+
+    def merge_group(self, group: list[_R]) -> list[_R]:
+        """
+        Folds the group into its survivor. Returns the group sorted by
+        survivor_key, with the (modified) survivor first.
+        """
+        group = sorted(group, key=self.survivor_key)
+        for other in group[1:]:
+            self._merge(group[0], other)
+        return group
+
+    def run(self, records: Iterable[_R]) -> DedupeResult[_R]:
+        groups = [self.merge_group(group) for group in self.find_groups(records)]
+        logger.info(
+            "Found %d duplicate groups in %s, with %d records to delete",
+            len(groups),
+            self.record_class.module,
+            sum(len(group) - 1 for group in groups),
+        )
+        return DedupeResult(groups=groups)
@@ -1,27 +1,35 @@
 import requests
 
+from zoho.json_codec import get_json_codec
 
-class ZohoHTTPError(Exception):
+
+class ZohoException(Exception):
+    """Base class of the exceptions raised by this package."""
+
+
+class ZohoHTTPError(ZohoException):
     code: str | None = None
     message: str | None = None
 
     def __init__(self, response: requests.Response):
         self.response = response
         super().__init__(f"[{response.status_code}]: {response.text.strip()} (url: {response.url})")
+        # Parsed once, here:
+        try:
+            self._json = get_json_codec().loads(response.content)
+        except Exception:
+            self._json = None
         try:
-            self.code = response.json()["data"][0]["code"]
+            self.code = self._json["data"][0]["code"]
         except Exception:
             self.code = None
         try:
-            self.message = response.json()["data"][0]["message"]
+            self.message = self._json["data"][0]["message"]
         except Exception:
             self.message = None
 
     def json(self):
-        try:
-            return self.response.json()
-        except Exception:
-            return None
+        return self._json
 
     @classmethod
     def raise_for_status(cls, response: requests.Response):
@@ -32,3 +40,10 @@ class ZohoHTTPError(Exception):
         """
         if response.status_code >= 400:
             raise cls(response=response)
+
+
+class ZohoBulkJobError(ZohoException):
+    """A Bulk Read or Bulk Write job ended in failure."""
+    def __init__(self, job: dict):
+        self.job = job
+        super().__init__(f"Bulk job {job.get('id')} failed: {job}")
@@ -0,0 +1,89 @@
+import datetime
+import json
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from typing import Any
+
+from zoho.settings import settings
+
+
+_default_codec: "JSONCodec | None" = None
+
+
+def _default(value: Any) -> Any:
+    """
+    Types that neither json nor orjson serialize by themselves. Decimals
+    become floats only if that doesn't change their value (which holds for
+    up to 15 significant digits), and strings otherwise, since json cannot
+    write arbitrary number text.
+    """
+    if isinstance(value, Decimal):
+        as_float = float(value)
+        return as_float if Decimal(repr(as_float)) == value else str(value)
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {value.__class__.__name__} is not JSON serializable")
+
+
+class JSONCodec(ABC):
+    """
+    Encodes request bodies and decodes response bodies for ZohoRequestor
+    and AsyncZohoRequestor. To use your own, set zoho.settings.json_codec to
+    an instance of a subclass; otherwise get_json_codec() picks one.
+    """
+    @abstractmethod
+    def dumps(self, value: Any) -> bytes:
+        ...
+
+    @abstractmethod
+    def loads(self, data: bytes | str) -> Any:
+        ...
+
+
+class StdlibJSONCodec(JSONCodec):
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, default=_default, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonJSONCodec(JSONCodec):
+    """
+    Several times faster than StdlibJSONCodec. Requires `orjson`. With
+    orjson >= 3.9, Decimals are written as the exact number they hold.
+    """
+    def __init__(self):
+        import orjson
+
+        self._dumps = orjson.dumps
+        self._fragment = getattr(orjson, "Fragment", None)
+        self._loads = orjson.loads
+
+    def _default(self, value: Any) -> Any:
+        if self._fragment is not None and isinstance(value, Decimal) and value.is_finite():
+            return self._fragment(str(value))
+        return _default(value)
+
+    def dumps(self, value: Any) -> bytes:
+        return self._dumps(value, default=self._default)
+
+    def loads(self, data: bytes | str) -> Any:
+        return self._loads(data)
+
+
+def get_json_codec() -> JSONCodec:
+    """
+    settings.json_codec if set, otherwise OrjsonJSONCodec if orjson is
+    installed, and StdlibJSONCodec if not.
+    """
+    global _default_codec  # pylint: disable=global-statement
+
+    if settings.json_codec is not None:
+        return settings.json_codec
+    if _default_codec is None:
+        try:
+            _default_codec = OrjsonJSONCodec()
+        except ImportError:
+            _default_codec = StdlibJSONCodec()
+    return _default_codec
@@ -0,0 +1,214 @@
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Generic, Iterable, TypeVar
+
+from zoho.records.modules.base import AbstractModuleRecord
+from zoho.search import BetweenCriterion, Criterion, InCriterion, Search
+from zoho.sync import CheckpointStore, DeltaSync
+
+
+logger = logging.getLogger(__name__)
+
+_R = TypeVar("_R", bound=AbstractModuleRecord)
+
+# Search operator -> SQL operator, for the ones that take a single value:
+SQL_OPERATORS = {
+    "equals": "=",
+    "not_equal": "!=",
+    "greater_than": ">",
+    "greater_equal": ">=",
+    "less_than": "<",
+    "less_equal": "<=",
+}
+
+# Field names, optionally with a path into nested dicts (e.g. Owner.id):
+FIELD_PATTERN = re.compile(r"^[A-Za-z0-9_]+(\.[A-Za-z0-9_]+)*$")
+
+
+class SQLiteCheckpointStore(CheckpointStore):
+    """Keeps DeltaSync checkpoints in a table of the mirror's own database."""
+    def __init__(self, connection: sqlite3.Connection, lock: threading.Lock):
+        self._connection = connection
+        self._lock = lock
+        with self._lock:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints (key TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._connection.execute("DELETE FROM checkpoints WHERE key = ?", (key,))
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            row = self._connection.execute("SELECT data FROM checkpoints WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, checkpoint: dict[str, Any]):
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO checkpoints (key, data) VALUES (?, ?)",
+                (key, json.dumps(checkpoint)),
+            )
+
+
+class ModuleMirror(Generic[_R]):
+    """
+    Local copy of a module in an SQLite database, kept up to date with
+    DeltaSync, for lookups that would otherwise go through the search API.
+    Records are stored as the raw API dicts, and `indexes` get expression
+    indexes on their JSON values, so lookups on them take milliseconds.
+
+    Text comparisons are case-insensitive, like in the search API. Records
+    deleted in Zoho are not removed by refresh(); use delete() for that, or
+    clear() and refresh() to rebuild the mirror.
+
+    Usage:
+        mirror = ModuleMirror(Lead, "leads.db", indexes=["Email"])
+        mirror.refresh()
+        leads = mirror.query(Search().eq(Email="foo@example.com"))
+
+    @param fields Fields to store; defaults to all of the record class's.
+    @param indexes Fields to index. Dotted paths (like Owner.id) work too.
+    """
+    def __init__(
+        self,
+        record_class: type[_R],
+        path: str,
+        indexes: Iterable[str] = (),
+        fields: list[str] | None = None,
+    ):
+        self.record_class = record_class
+        self.path = path
+        self.fields = fields
+        self.table = f"mirror_{record_class.module}"
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            f'CREATE TABLE IF NOT EXISTS "{self.table}" (id TEXT PRIMARY KEY, data TEXT NOT NULL)'
+        )
+        self.checkpoints = SQLiteCheckpointStore(self._connection, self._lock)
+        for index in indexes:
+            self._connection.execute(
+                f'CREATE INDEX IF NOT EXISTS "{self.table}_{index}" '
+                f'ON "{self.table}" ({self._get_expression(index)})'
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(f'SELECT COUNT(*) FROM "{self.table}"').fetchone()[0]
+
+    @staticmethod
+    def _get_expression(key: str) -> str:
+        if not FIELD_PATTERN.match(key):
+            raise ValueError(f"Invalid field name: {key}")
+        return f"json_extract(data, '$.{key}') COLLATE NOCASE"
+
+    @staticmethod
+    def _get_sql_value(value: Any) -> Any:
+        if isinstance(value, bool):
+            # This is how json_extract() returns them:
+            return int(value)
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return value
+
+    def _get_where(self, criterion: Criterion) -> tuple[str, list[Any]]:
+        expression = self._get_expression(criterion.key)
+
+        if isinstance(criterion, InCriterion):
+            placeholders = ", ".join("?" for _ in criterion.value)
+            return f"{expression} IN ({placeholders})", [self._get_sql_value(v) for v in criterion.value]
+        if isinstance(criterion, BetweenCriterion):
+            return f"{expression} BETWEEN ? AND ?", [self._get_sql_value(v) for v in criterion.value]
+        if criterion.operator == "starts_with":
+            value = str(criterion.value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            return f"{expression} LIKE ? ESCAPE '\\'", [f"{value}%"]
+        if criterion.operator in SQL_OPERATORS:
+            return f"{expression} {SQL_OPERATORS[criterion.operator]} ?", [self._get_sql_value(criterion.value)]
+        raise ValueError(f"Unsupported search operator: {criterion.operator}")
+
+    def clear(self):
+        """Empties the mirror and resets its sync checkpoint."""
+        with self._lock:
+            self._connection.execute(f'DELETE FROM "{self.table}"')
+        self.checkpoints.delete(self.record_class.module)
+
+    def close(self):
+        self._connection.close()
+
+    def delete(self, record_ids: Iterable[str]):
+        with self._lock:
+            self._connection.executemany(f'DELETE FROM "{self.table}" WHERE id = ?', [(i,) for i in record_ids])
+
+    def get(self, record_id: str) -> _R | None:
+        with self._lock:
+            row = self._connection.execute(f'SELECT data FROM "{self.table}" WHERE id = ?', (record_id,)).fetchone()
+        return self.record_class.from_dict(json.loads(row[0])) if row else None
+
+    def query(
+        self,
+        search: Search | None = None,
+        limit: int | None = None,
+        order_by: str | None = None,
+        **kwargs,
+    ) -> list[_R]:
+        """
+        Same criteria as AbstractModuleRecord.list(), but run against the
+        mirror.
+
+        @param order_by Field to sort by; prefix with "-" for descending.
+        """
+        search = self.record_class._get_search(search, **kwargs)  # pylint: disable=protected-access
+        sql = f'SELECT data FROM "{self.table}"'
+        params: list[Any] = []
+
+        if search and search.criteria:
+            wheres = []
+            for criterion in search.criteria:
+                where, where_params = self._get_where(criterion)
+                wheres.append(where)
+                params.extend(where_params)
+            sql += " WHERE " + " AND ".join(wheres)
+        if order_by:
+            descending = order_by.startswith("-")
+            sql += f" ORDER BY {self._get_expression(order_by.lstrip('-'))}{' DESC' if descending else ''}"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._connection.execute(sql, params).fetchall()
+        return [self.record_class.from_dict(json.loads(row[0])) for row in rows]
+
+    def refresh(self, prefetch: int | None = None) -> int:
+        """
+        Fetches the records modified since the last refresh (all of them,
+        the first time) and returns their number.
+        """
+        started = time.monotonic()
+        sync = DeltaSync(self.record_class, self.checkpoints, fields=self.fields, prefetch=prefetch)
+        count = 0
+
+        for rows in sync.iter_pages():
+            with self._lock:
+                self._connection.execute("BEGIN")
+                self._connection.executemany(
+                    f'INSERT OR REPLACE INTO "{self.table}" (id, data) VALUES (?, ?)',
+                    [(row["id"], json.dumps(row)) for row in rows if row.get("id", None)],
+                )
+                self._connection.execute("COMMIT")
+            count += len(rows)
+
+        logger.info(
+            "Refreshed %s mirror: %d records in %.1f s",
+            self.record_class.module,
+            count,
+            time.monotonic() - started,
+        )
+        return count
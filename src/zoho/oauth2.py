@@ -4,12 +4,14 @@ import sys
 import webbrowser
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Self
 from urllib.parse import parse_qs, urlencode, urlparse
 
 import requests
 
 from zoho.exceptions import ZohoHTTPError
-from zoho.settings import settings
+from zoho.json_codec import get_json_codec
+from zoho.settings import BULK_SCOPES, settings
 from zoho.utils import now
 
 
@@ -23,6 +25,10 @@ class OAuth2Token:
         self.token_type = token["token_type"]
         self.expires = now() + datetime.timedelta(seconds=token["expires_in"])
 
+    def is_valid(self, margin: float = 0) -> bool:
+        """Whether the token is valid for at least `margin` more seconds."""
+        return self.expires - datetime.timedelta(seconds=margin) > now()
+
 
 class ZohoOAuth2Token(OAuth2Token):
     api_domain: str
@@ -33,6 +39,22 @@ class ZohoOAuth2Token(OAuth2Token):
         self.api_domain = token["api_domain"]
         self.refresh_token = refresh_token or token["refresh_token"]
 
+    @classmethod
+    def from_dict(cls, data: dict) -> Self:
+        """Inverse of to_dict()."""
+        token = cls({**data, "expires_in": 0})
+        token.expires = datetime.datetime.fromisoformat(data["expires"])
+        return token
+
+    def to_dict(self) -> dict:
+        return {
+            "access_token": self.access_token,
+            "api_domain": self.api_domain,
+            "expires": self.expires.isoformat(),
+            "refresh_token": self.refresh_token,
+            "token_type": self.token_type,
+        }
+
 
 class AuthCallbackHandler(BaseHTTPRequestHandler):
     def write_response(self, encoding: str, content: str):
@@ -101,12 +123,19 @@ def get_oauth2_token_interactive():
     parser = argparse.ArgumentParser()
     parser.add_argument("--client-id", help="(optional) Will be used to set zoho.settings.client_id")
     parser.add_argument("--client-secret", help="(optional) Will be used to set zoho.settings.client_secret")
+    parser.add_argument(
+        "--bulk-scopes",
+        action="store_true",
+        help="(optional) Also request the scopes needed for bulk_read() and bulk_write()",
+    )
     args = parser.parse_args()
 
     if args.client_id is not None:
         settings.client_id = args.client_id
     if args.client_secret is not None:
         settings.client_secret = args.client_secret
+    if args.bulk_scopes:
+        settings.bulk_scopes = True
 
     if not settings.client_id or not settings.client_secret:
         print("zoho.settings.client_id and zoho.settings.client_secret must both be set to non-empty strings.")
@@ -114,8 +143,9 @@ def get_oauth2_token_interactive():
 
     webserver_address = f"http://{settings.local_webserver_host}:{settings.local_webserver_port}/"
 
+    scope = settings.scope + [s for s in BULK_SCOPES if settings.bulk_scopes and s not in settings.scope]
     params = {
-        "scope": ",".join(settings.scope),
+        "scope": ",".join(scope),
         "client_id": settings.client_id,
         "response_type": "code",
         "access_type": "offline",
@@ -129,31 +159,35 @@ def get_oauth2_token_interactive():
         httpd.handle_request()
 
 
-def get_oauth2_token_from_refresh_token(refresh_token: str):
+def get_refresh_token_url(refresh_token: str) -> str:
     params = {
         "refresh_token": refresh_token,
         "client_id": settings.client_id,
         "client_secret": settings.client_secret,
         "grant_type": "refresh_token",
     }
-    response = requests.post(url=f"{settings.token_url}?{urlencode(params)}", timeout=10)
+    return f"{settings.token_url}?{urlencode(params)}"
+
+
+def get_auth_code_data(auth_code: str) -> dict:
+    return {
+        "grant_type": "authorization_code",
+        "client_id": settings.client_id,
+        "client_secret": settings.client_secret,
+        "redirect_uri": f"http://{settings.local_webserver_host}:{settings.local_webserver_port}/",
+        "code": auth_code,
+    }
+
+
+def get_oauth2_token_from_refresh_token(refresh_token: str):
+    response = requests.post(url=get_refresh_token_url(refresh_token), timeout=10)
     ZohoHTTPError.raise_for_status(response)
-    return ZohoOAuth2Token(response.json(), refresh_token=refresh_token)
+    return ZohoOAuth2Token(get_json_codec().loads(response.content), refresh_token=refresh_token)
 
 
 def get_oauth2_token_from_auth_code(auth_code: str):
-    response = requests.post(
-        url=settings.token_url,
-        data={
-            "grant_type": "authorization_code",
-            "client_id": settings.client_id,
-            "client_secret": settings.client_secret,
-            "redirect_uri": f"http://{settings.local_webserver_host}:{settings.local_webserver_port}/",
-            "code": auth_code,
-        },
-        timeout=10,
-    )
+    response = requests.post(url=settings.token_url, data=get_auth_code_data(auth_code), timeout=10)
     ZohoHTTPError.raise_for_status(response)
-    token = ZohoOAuth2Token(response.json())
+    token = ZohoOAuth2Token(get_json_codec().loads(response.content))
     settings.refresh_token = token.refresh_token
     return token
@@ -0,0 +1,182 @@
+import asyncio
+import datetime
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Iterator, Mapping
+
+from zoho.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+# Used on 429 responses that don't say how long to wait:
+DEFAULT_RETRY_DELAY = 10.0
+# Credits charged per call by endpoints that cost more than the default 1.
+# See https://www.zoho.com/crm/developer/docs/api/v5/api-limits.html
+BULK_READ_COST = 50
+BULK_WRITE_COST = 500
+
+
+def get_backoff_delay(attempt: int) -> float:
+    """
+    Exponential backoff with jitter for retry number `attempt` (1-based):
+    somewhere between half and all of settings.retry_backoff * 2^(attempt-1),
+    capped at settings.retry_backoff_max.
+    """
+    delay = min(settings.retry_backoff * 2 ** (attempt - 1), settings.retry_backoff_max)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def get_coql_cost(limit: int) -> int:
+    """Credits charged for a COQL query with LIMIT `limit`."""
+    if limit <= 200:
+        return 1
+    if limit <= 1000:
+        return 2
+    return 3
+
+
+def get_record_write_cost(count: int) -> int:
+    """
+    Credits charged for inserting, updating or upserting `count` records in
+    one call: 1 per started batch of 10.
+    """
+    return max((count + 9) // 10, 1)
+
+
+def get_retry_delay(headers: Mapping[str, str]) -> float | None:
+    """
+    Seconds to wait before the next request according to the response
+    headers: `Retry-After` (seconds or HTTP date) if present, otherwise
+    `X-RATELIMIT-RESET` if `X-RATELIMIT-REMAINING` says we have run out.
+    """
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+            return max((retry_at - datetime.datetime.now(retry_at.tzinfo)).total_seconds(), 0.0)
+        except (TypeError, ValueError):
+            pass
+
+    remaining = headers.get("X-RATELIMIT-REMAINING")
+    reset = headers.get("X-RATELIMIT-RESET")
+    if remaining is not None and reset is not None:
+        try:
+            if int(remaining) > 0:
+                return None
+            reset_value = float(reset)
+        except ValueError:
+            return None
+        # The reset header has been seen both as a timestamp (in s or ms) and
+        # as a duration in ms.
+        if reset_value > 1e12:
+            return max(reset_value / 1000 - time.time(), 0.0)
+        if reset_value > 1e9:
+            return max(reset_value - time.time(), 0.0)
+        return reset_value / 1000
+
+    return None
+
+
+class RateLimiter:
+    """
+    Token bucket for API credits, plus a cap on concurrent requests. Meant to
+    be shared by everything that uses the same requestor, so that a 429 or an
+    exhausted credit budget pauses all callers, not just the one that got it.
+
+    @param budget Credits that may be spent per `period` seconds. None
+    means no client-side budget; we then only react to the server's
+    rate-limit headers.
+    """
+    def __init__(
+        self,
+        budget: int | None = None,
+        period: float = 60.0,
+        max_concurrency: int | None = None,
+    ):
+        self.budget = budget
+        self.period = period
+        self._available = float(budget or 0)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_concurrency or settings.max_concurrency)
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            budget=settings.rate_limit_credits,
+            period=settings.rate_limit_period,
+            max_concurrency=settings.max_concurrency,
+        )
+
+    def _get_delay(self, cost: float) -> float:
+        """Reserves `cost` credits and returns 0, or returns time to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if self._blocked_until > now:
+                return self._blocked_until - now
+            if not self.budget:
+                return 0.0
+            self._available = min(
+                float(self.budget),
+                self._available + (now - self._updated) * self.budget / self.period,
+            )
+            self._updated = now
+            if self._available >= cost:
+                self._available -= cost
+                return 0.0
+            # A cost larger than the whole budget can never be reserved, so it
+            # waits for a full bucket and then takes it all:
+            if cost > self.budget and self._available >= self.budget:
+                self._available = 0.0
+                return 0.0
+            return (min(cost, self.budget) - self._available) * self.period / self.budget
+
+    @asynccontextmanager
+    async def aacquire(self, cost: float = 1) -> AsyncIterator[None]:
+        """
+        Async version of acquire(), for AsyncZohoRequestor. Waits for credits
+        and blocks just like acquire(), but the concurrency cap is left to
+        the caller, since a thread semaphore cannot be awaited.
+        """
+        while (delay := self._get_delay(cost)) > 0:
+            await asyncio.sleep(delay)
+        yield
+
+    @contextmanager
+    def acquire(self, cost: float = 1) -> Iterator[None]:
+        """
+        Waits until `cost` credits are available and no 429 is pausing
+        callers, and then holds one of the `max_concurrency` slots.
+        """
+        while (delay := self._get_delay(cost)) > 0:
+            time.sleep(delay)
+        with self._semaphore:
+            yield
+
+    def block(self, seconds: float):
+        """Makes all callers wait `seconds` before their next request."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def update(self, status_code: int, headers: Mapping[str, str]) -> float | None:
+        """
+        Registers a response. Returns the number of seconds the server told us
+        to back off, if any, after blocking all callers for that long.
+        """
+        delay = get_retry_delay(headers)
+        if delay is None and status_code == 429:
+            delay = DEFAULT_RETRY_DELAY
+        if delay is not None:
+            logger.warning("Rate limit reached (status %d), pausing requests for %.1f s", status_code, delay)
+            self.block(delay)
+        return delay
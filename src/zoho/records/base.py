@@ -2,52 +2,329 @@ import datetime
 import importlib
 from abc import ABC
 from copy import deepcopy
-from dataclasses import Field, dataclass, fields
+from dataclasses import MISSING, Field, dataclass, fields
 from types import GenericAlias, NoneType, UnionType
-from typing import Any, Literal, Self
+from typing import Any, Callable, ClassVar, Literal, NamedTuple, Self
 
 from klaatu_python.utils import getitem0_nullable
 
 from zoho.utils import get_timezone
 
 
+class FieldCodec(NamedTuple):
+    """
+    Everything from_dict() needs to know about a field, resolved once per
+    record class instead of once per field and row.
+    """
+    name: str
+    dict_key: str
+    field: Field
+    type: type | None
+    is_list: bool
+    is_record_list: bool
+    decode: Callable[[Any], Any]
+
+
+def _copy_json(value: Any) -> Any:
+    """Much faster than deepcopy(), for JSON values."""
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    return value
+
+
+def _restore_record(base: "type[AbstractRecord]", compact: bool, state: dict[str, Any]) -> "AbstractRecord":
+    """
+    Unpickles instances of compact_class() and lazy_class() classes. Those
+    are generated at runtime and can't be looked up by name, so they are
+    pickled as their base class plus this function, which regenerates them.
+    """
+    record_class = base.compact_class() if compact else base.lazy_class()
+    record = record_class.__new__(record_class)
+    for name, value in state.items():
+        object.__setattr__(record, name, value)
+    return record
+
+
+def _generated_record_eq(self: "AbstractRecord", other: object) -> bool:
+    """
+    __eq__ of compact_class() and lazy_class() classes. The dataclass
+    __eq__ only compares instances of the exact same class, so this makes
+    e.g. LazyLead and Lead instances with the same field values equal,
+    whichever side of the == they are on.
+    """
+    if not isinstance(other, AbstractRecord) or other.base_class() is not self.base_class():
+        return NotImplemented
+    return all(getattr(self, f.name) == getattr(other, f.name) for f in fields(self) if f.compare)
+
+
+class LazyField:
+    """
+    Descriptor for the fields of lazy_class() records: decodes the value
+    from the instance's raw dict on first access, and keeps the result in
+    the instance's __dict__.
+    """
+    def __init__(self, codec: FieldCodec):
+        self.codec = codec
+
+    def __get__(self, obj: "AbstractRecord | None", objtype: type | None = None) -> Any:
+        field = self.codec.field
+
+        if obj is None:
+            return field.default if field.default is not MISSING else self
+
+        values = obj.__dict__
+        name = self.codec.name
+        if name in values:
+            return values[name]
+
+        value: Any = MISSING
+        raw = values.get("_raw", None)
+        if field.init and raw is not None and self.codec.dict_key in raw:
+            try:
+                value = self.codec.decode(raw[self.codec.dict_key])
+            except (ValueError, TypeError):
+                pass
+        if value is MISSING:
+            if field.default is not MISSING:
+                value = field.default
+            elif field.default_factory is not MISSING:
+                value = field.default_factory()  # type: ignore
+            else:
+                # Required field that could not be decoded; from_dict()
+                # would have raised TypeError.
+                raise TypeError(f"Could not decode {name}")
+
+        values[name] = value
+        return value
+
+    def __set__(self, obj: "AbstractRecord", value: Any):
+        obj.__dict__[self.codec.name] = value
+
+
+_compact_classes: dict[type, type] = {}
+_field_codecs: dict[type, list[FieldCodec]] = {}
+_lazy_classes: dict[type, type] = {}
+_output_codecs: dict[type, list[FieldCodec]] = {}
+
+# Values of these types are passed on by to_dict() without conversion:
+_PLAIN_OUTPUT_TYPES = (str, int, float, bool)
+
+
 @dataclass
 class AbstractRecord(ABC):
+    # Set on classes generated by compact_class() and lazy_class():
+    _is_compact = False
+    _is_lazy = False
+    # Set on classes generated by lazy_class():
+    _required_keys: ClassVar[tuple[str, ...]] = ()
+
+    @classmethod
+    def _build_decoder(cls, field: Field, _type: type | None, is_record_list: bool) -> Callable[[Any], Any]:
+        if cls._is_compact and _type is not None and issubclass(_type, AbstractRecord):
+            _type = _type.compact_class()
+        elif cls._is_lazy and _type is not None and issubclass(_type, AbstractRecord):
+            _type = _type.lazy_class()
+
+        if is_record_list:
+            assert _type is not None and issubclass(_type, AbstractRecord)
+            from_dict = _type.from_dict
+            return lambda value: [from_dict(row) for row in value] if isinstance(value, list) else value
+
+        if isinstance(field.type, GenericAlias) and field.type.__origin__ == list:
+            return lambda value: value
+
+        if getattr(cls.handle_input_field, "__func__", None) is not getattr(
+            AbstractRecord.handle_input_field, "__func__"
+        ):
+            return lambda value: cls.handle_input_field(field, value)
+
+        if _type is None:
+            return lambda value: value
+
+        if issubclass(_type, datetime.date):
+            fromisoformat = _type.fromisoformat
+            return lambda value: None if value is None else fromisoformat(value)
+
+        is_record = issubclass(_type, AbstractRecord)
+
+        def decode(value: Any) -> Any:
+            if value is None or value.__class__ is _type:
+                return value
+            if is_record and isinstance(value, dict):
+                return _type.from_dict(value)  # type: ignore
+            try:
+                return _type(value)  # type: ignore
+            except TypeError:
+                return value
+
+        return decode
+
     @classmethod
     def attrname_to_dict_key(cls, attrname: str) -> str:
         return attrname
 
+    @classmethod
+    def base_class(cls) -> "type[AbstractRecord]":
+        """
+        The class that compact_class() or lazy_class() made `cls` from, or
+        else `cls` itself.
+        """
+        return cls.__mro__[1] if cls._is_compact or cls._is_lazy else cls
+
+    @classmethod
+    def compact_class(cls) -> "type[Self]":
+        """
+        Generated subclass that keeps its fields in __slots__ instead of a
+        per-instance __dict__, which roughly halves the memory use of large
+        result sets (nested records are decoded into compact classes too).
+        Otherwise it behaves just like `cls`, e.g. Lead.compact_class().list()
+        returns instances of Lead, except that no attributes other than the
+        fields can be set on the instances.
+        """
+        if cls._is_compact:
+            return cls
+        if cls._is_lazy:
+            raise TypeError("Lazy record classes cannot be made compact")
+
+        compact = _compact_classes.get(cls)
+
+        if compact is None:
+            # Fields that have a plain default and are not set by the caller
+            # (like `module`) stay class attributes, since they may be read
+            # from the class itself.
+            class_fields = [f.name for f in fields(cls) if not f.init and f.default is not MISSING]
+            slot_fields = [f for f in fields(cls) if f.name not in class_fields]
+            slot_names = frozenset(f.name for f in slot_fields)
+            positional = [f.name for f in slot_fields if f.init and not f.kw_only]
+            set_slot = object.__setattr__
+
+            # Replaces the dataclass __init__, which would also set the class
+            # fields on the instance, and thereby create a __dict__.
+            def __init__(self, *args, **kwargs):
+                if len(args) > len(positional):
+                    raise TypeError(
+                        f"{cls.__name__}.__init__() takes {len(positional)} positional arguments "
+                        f"but {len(args)} were given"
+                    )
+                for name, value in zip(positional, args):
+                    if name in kwargs:
+                        raise TypeError(f"{cls.__name__}.__init__() got multiple values for argument '{name}'")
+                    kwargs[name] = value
+                for f in slot_fields:
+                    if f.init and f.name in kwargs:
+                        value = kwargs.pop(f.name)
+                    elif f.default is not MISSING:
+                        value = f.default
+                    elif f.default_factory is not MISSING:
+                        value = f.default_factory()
+                    else:
+                        raise TypeError(f"{cls.__name__}.__init__() missing required argument: '{f.name}'")
+                    set_slot(self, f.name, value)
+                if kwargs:
+                    raise TypeError(
+                        f"{cls.__name__}.__init__() got an unexpected keyword argument '{next(iter(kwargs))}'"
+                    )
+                if hasattr(self, "__post_init__"):
+                    self.__post_init__()
+
+            # The parent classes have a __dict__ slot, so without this, any
+            # other attribute could still be set (and would create one):
+            def __setattr__(self, name: str, value: Any):
+                if name not in slot_names:
+                    raise AttributeError(f"'{self.__class__.__name__}' object has no attribute '{name}'")
+                set_slot(self, name, value)
+
+            def __reduce__(self):
+                state = {name: getattr(self, name) for name in slot_names if hasattr(self, name)}
+                return _restore_record, (cls, True, state)
+
+            compact = type(
+                f"Compact{cls.__name__}",
+                (cls,),
+                {
+                    "__eq__": _generated_record_eq,
+                    # Would otherwise be set to None because of __eq__:
+                    "__hash__": cls.__hash__,
+                    "__init__": __init__,
+                    "__module__": cls.__module__,
+                    "__qualname__": f"Compact{cls.__qualname__}",
+                    "__reduce__": __reduce__,
+                    "__setattr__": __setattr__,
+                    "__slots__": tuple(f.name for f in fields(cls) if f.name not in class_fields),
+                    "_is_compact": True,
+                },
+            )
+            _compact_classes[cls] = compact
+
+        return compact
+
     @classmethod
     def dict_keys(cls) -> list[str]:
-        return [cls.attrname_to_dict_key(f.name) for f in fields(cls)]
+        return [codec.dict_key for codec in cls.get_field_codecs()]
 
     @classmethod
     def from_dict(cls, data: dict[str, Any]) -> "Self":
         """
         Converts a dict into a record object, in a nested manner (i.e. also
         converts fields that are annotated as records or lists of records).
+        Values that fail conversion are left out, so the field gets its
+        default.
         """
-        record_fields = fields(cls)
-        field_names = [f.name for f in record_fields]
-
-        for field in record_fields:
-            dict_key = cls.attrname_to_dict_key(field.name)
-            if dict_key in data:
-                if isinstance(field.type, GenericAlias) and field.type.__origin__ == list:
-                    _type = cls.type_or_none(field.type.__args__[0])
-                    if (
-                        _type is not None and
-                        issubclass(_type, AbstractRecord) and
-                        isinstance(data[dict_key], list)
-                    ):
-                        data[field.name] = [_type.from_dict(row) for row in data[dict_key]]
-                else:
-                    try:
-                        data[field.name] = cls.handle_input_field(field, data[dict_key])
-                    except (ValueError, TypeError):
-                        del data[dict_key]
+        if cls._is_lazy and all(key in data for key in cls._required_keys):
+            record = cls.__new__(cls)
+            record.__dict__["_raw"] = data
+            return record
+
+        kwargs: dict[str, Any] = {}
+
+        for codec in cls.get_field_codecs():
+            if codec.dict_key in data and codec.field.init:
+                try:
+                    kwargs[codec.name] = codec.decode(data[codec.dict_key])
+                except (ValueError, TypeError):
+                    pass
+
+        return cls(**kwargs)
+
+    @classmethod
+    def get_field_codecs(cls) -> list[FieldCodec]:
+        """Built on first use and then cached for the class."""
+        codecs = _field_codecs.get(cls)
+
+        if codecs is None:
+            codecs = []
+            for field in fields(cls):
+                is_list = isinstance(field.type, GenericAlias) and field.type.__origin__ == list
+                _type = cls.type_or_none(field.type.__args__[0] if is_list else field.type)  # type: ignore
+                is_record_list = is_list and _type is not None and issubclass(_type, AbstractRecord)
+                codecs.append(
+                    FieldCodec(
+                        name=field.name,
+                        dict_key=cls.attrname_to_dict_key(field.name),
+                        field=field,
+                        type=_type,
+                        is_list=is_list,
+                        is_record_list=is_record_list,
+                        decode=cls._build_decoder(field, _type, is_record_list),
+                    )
+                )
+            _field_codecs[cls] = codecs
 
-        return cls(**{k: v for k, v in data.items() if k in field_names})
+        return codecs
+
+    @classmethod
+    def get_output_codecs(cls) -> list[FieldCodec]:
+        """The codecs of the fields that to_dict() outputs."""
+        codecs = _output_codecs.get(cls)
+
+        if codecs is None:
+            # Let's not fuck around with Owner just now.
+            codecs = [c for c in cls.get_field_codecs() if c.field.init and c.dict_key != "Owner"]
+            _output_codecs[cls] = codecs
+
+        return codecs
 
     @classmethod
     def handle_input_field(cls, field: Field, value: Any) -> Any:
@@ -68,6 +345,61 @@ class AbstractRecord(ABC):
 
         return value
 
+    @classmethod
+    def lazy_class(cls) -> "type[Self]":
+        """
+        Generated subclass whose from_dict() keeps the raw dict and decodes
+        each field on first access instead, which saves most of the decoding
+        time when only a few fields of each record are read, e.g.
+        Lead.lazy_class().list() for filtering on Email. Decoded values are
+        kept, so each field is decoded at most once. to_dict() gives the
+        same output as for `cls`, but takes plain values (strings, numbers,
+        lists) that have not been accessed or set straight from the raw
+        dict.
+
+        Since the raw dicts are kept, the records use a bit more memory than
+        those of `cls`. Don't modify the dict passed to from_dict()
+        afterwards, since it is not copied.
+        """
+        if cls._is_lazy:
+            return cls
+        if cls._is_compact:
+            raise TypeError("Compact record classes cannot be made lazy")
+
+        lazy: "type[Self] | None" = _lazy_classes.get(cls)
+
+        if lazy is None:
+            required_keys = tuple(
+                cls.attrname_to_dict_key(f.name)
+                for f in fields(cls)
+                if f.init and f.default is MISSING and f.default_factory is MISSING
+            )
+            lazy = type(
+                f"Lazy{cls.__name__}",
+                (cls,),
+                {
+                    "__eq__": _generated_record_eq,
+                    # Would otherwise be set to None because of __eq__:
+                    "__hash__": cls.__hash__,
+                    "__module__": cls.__module__,
+                    "__qualname__": f"Lazy{cls.__qualname__}",
+                    "__reduce__": lambda self: (_restore_record, (cls, False, dict(self.__dict__))),
+                    "_is_lazy": True,
+                    "_required_keys": required_keys,
+                },
+            )
+            # The codecs of the lazy class itself, so nested records are
+            # decoded into lazy classes too:
+            codecs = lazy.get_field_codecs()
+            for codec in codecs:
+                # Fields like `module` stay plain class attributes, since
+                # they may be read from the class itself:
+                if codec.field.init or codec.field.default is MISSING:
+                    setattr(lazy, codec.name, LazyField(codec))
+            _lazy_classes[cls] = lazy
+
+        return lazy
+
     @classmethod
     def type_or_none(cls, arg: Any) -> type | None:
         if isinstance(arg, str):
@@ -102,32 +434,60 @@ class AbstractRecord(ABC):
         return value
 
     def to_dict(self) -> dict:
-        record_fields = [f for f in fields(self) if f.init]
         data: dict[str, Any] = {}
+        timezone: datetime.tzinfo | None = None
+        has_output_hook = (
+            getattr(self.handle_output_field, "__func__", None) is not AbstractRecord.handle_output_field
+        )
+        has_input_hook = getattr(self.handle_input_field, "__func__", None) is not getattr(
+            AbstractRecord.handle_input_field, "__func__"
+        )
+        # For lazy records: the raw values of fields that have not been
+        # decoded can be output as they are, if decoding them would not
+        # change them. Others (like dates, which are converted to
+        # settings.timezone, Decimals and nested records) are decoded and
+        # output like for any other record.
+        raw: dict[str, Any] | None = (
+            self.__dict__.get("_raw", None) if self._is_lazy and not has_output_hook and not has_input_hook else None
+        )
 
-        for f in record_fields:
-            key = self.attrname_to_dict_key(f.name)
-            attr = self.__dict__[f.name]
+        for codec in self.get_output_codecs():
+            if raw is not None and codec.name not in self.__dict__:
+                if codec.dict_key in raw:
+                    value = raw[codec.dict_key]
+                    if codec.is_list and not codec.is_record_list:
+                        data[codec.dict_key] = _copy_json(value) if isinstance(value, list) else value
+                        continue
+                    if value is None and not codec.is_list:
+                        continue
+                    if value.__class__ is codec.type and value.__class__ in _PLAIN_OUTPUT_TYPES:
+                        data[codec.dict_key] = value
+                        continue
+                elif codec.field.default is None:
+                    # Would be skipped below anyway.
+                    continue
 
-            # Let's not fuck around with Owner just now.
-            if key == "Owner":
-                continue
+            attr = getattr(self, codec.name)
 
-            if isinstance(f.type, GenericAlias) and f.type.__origin__ == list:
-                _type = self.type_or_none(f.type.__args__[0])
-                if _type is not None and issubclass(_type, AbstractRecord) and isinstance(attr, list):
-                    data[key] = [row.to_dict() for row in attr if isinstance(row, AbstractRecord)]
+            if codec.is_list:
+                if codec.is_record_list and isinstance(attr, list):
+                    data[codec.dict_key] = [row.to_dict() for row in attr if isinstance(row, AbstractRecord)]
                 else:
-                    data[key] = self.handle_output_field(f.name, attr)
+                    data[codec.dict_key] = self.handle_output_field(codec.name, attr) if has_output_hook else attr
+            elif attr is None:
+                continue
+            elif attr.__class__ in _PLAIN_OUTPUT_TYPES:
+                data[codec.dict_key] = self.handle_output_field(codec.name, attr) if has_output_hook else attr
+            elif isinstance(attr, AbstractRecord):
+                data[codec.dict_key] = attr.to_dict()
+            elif isinstance(attr, datetime.datetime):
+                if timezone is None:
+                    timezone = get_timezone()
+                data[codec.dict_key] = attr.replace(microsecond=0).astimezone(timezone).isoformat()
+            elif isinstance(attr, datetime.date):
+                data[codec.dict_key] = attr.isoformat()
             else:
-                if isinstance(attr, AbstractRecord):
-                    data[key] = attr.to_dict()
-                elif isinstance(attr, datetime.datetime):
-                    data[key] = attr.replace(microsecond=0).astimezone(get_timezone()).isoformat()
-                elif isinstance(attr, datetime.date):
-                    data[key] = attr.isoformat()
-                elif attr is not None:
-                    data[key] = self.handle_output_field(f.name, attr)
+                data[codec.dict_key] = self.handle_output_field(codec.name, attr) if has_output_hook else attr
 
         return data
 
@@ -1,119 +1,708 @@
+import asyncio
+import datetime
+import logging
+import sys
 from abc import ABC
 from dataclasses import dataclass, field
-from typing import Self
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterator, List, Self
 
-from klaatu_python.utils import partition, zip_dict_lists
+from klaatu_python.utils import partition
 
+from zoho.bulk import (
+    BULK_WRITE_MAX_ROWS,
+    create_read_job,
+    download_result,
+    get_csv_converter,
+    iter_csv_rows,
+    run_write_job,
+    wait_for_job,
+)
+from zoho.ratelimit import get_record_write_cost
 from zoho.records.base import AbstractIDRecord
+from zoho.records.result import BulkResult
 from zoho.records.tag import Tag as ZohoTag
-from zoho.requestor import ZohoRequestor
-from zoho.search import Search
+from zoho.requestor import ZohoRequestor, get_page_url
+from zoho.search import SEARCH_MAX_CRITERIA, SEARCH_MAX_RECORDS, Search
 from zoho.settings import settings
+from zoho.utils import (
+    iter_merged_pages_by_id,
+    map_concurrently,
+    merge_dict_lists_by_id,
+    now,
+)
+
+
+if TYPE_CHECKING:
+    from zoho.columns import RecordColumns
+    from zoho.coql import Query
+
+
+logger = logging.getLogger(__name__)
+
+# Lower bound for Created_Time when splitting searches by time:
+SEARCH_MIN_CREATED_TIME = datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc)
 
 
 @dataclass
 class AbstractModuleRecord(AbstractIDRecord, ABC):
     module: str
 
+    @classmethod
+    async def _aget_api_url(cls):
+        from zoho.async_requestor import AsyncZohoRequestor
+
+        token = await AsyncZohoRequestor.singleton().get_token()
+        return f"{token.api_domain}/crm/v5/{cls.module}"
+
     @classmethod
     def _get_api_url(cls):
         return f"{ZohoRequestor.singleton().token.api_domain}/crm/v5/{cls.module}"
 
     @classmethod
-    def bulk_update(cls, records: list[Self]) -> list[Self]:
-        results: list[Self] = []
-        idx = 0
+    def _get_list_limit(cls, limit: int | None, search: Search | None) -> int:
+        """
+        `limit` if set. Otherwise settings.list_limit, except for searches
+        with "in" criteria that have to be split up: those ask for specific
+        records, so they get all of them.
+        """
+        if limit:
+            return limit
+        if search and search.needs_sharding():
+            return sys.maxsize
+        return settings.list_limit
+
+    @classmethod
+    def _get_list_url(cls, api_url: str, search: Search | None = None, **kwargs) -> str:
+        search = cls._get_search(search, **kwargs)
+        if search:
+            return f"{api_url}/search?criteria={search()}"
+        return api_url
+
+    @classmethod
+    def _get_search(cls, search: Search | None = None, **kwargs) -> Search | None:
+        if kwargs:
+            eq_kwargs = {k: v for k, v in kwargs.items() if not isinstance(v, list)}
+            in_kwargs = {k: v for k, v in kwargs.items() if isinstance(v, list)}
+            search = search or Search()
+            if eq_kwargs:
+                search = search.eq(**eq_kwargs)
+            if in_kwargs:
+                search = search.in_(**in_kwargs)
+        return search
+
+    @classmethod
+    def _get_rows(cls, fields: list[str], limit: int, search: Search | None = None) -> list[dict]:
+        per_page = limit if limit < 200 else 200
+        url = cls._get_list_url(cls._get_api_url(), search)
+
+        def get_list(field_list: list[str]) -> list[dict]:
+            return ZohoRequestor.singleton().get_list(
+                url=url,
+                get_params={"fields": ",".join(field_list)},
+                list_field="data",
+                limit=limit,
+                per_page=per_page,
+            )
+
+        return merge_dict_lists_by_id(map_concurrently(get_list, partition(fields, 50)))
+
+    @classmethod
+    def _get_sharded_rows(cls, fields: list[str], limit: int, search: Search) -> list[dict]:
+        """
+        Fetches the time windows of all shards of `search`, at most
+        settings.max_concurrency at a time. Each round only asks for as many
+        rows as are still missing to reach `limit`, and no more rounds are
+        started once it is reached.
+        """
+        rows_by_id: dict[str, dict] = {}
+        windows = [window for windows in map_concurrently(cls._get_time_windows, search.shard()) for window in windows]
+
+        for batch in partition(windows, settings.max_concurrency):
+            window_limit = min(limit - len(rows_by_id), SEARCH_MAX_RECORDS)
+
+            def get_rows(window: Search, window_limit: int = window_limit) -> list[dict]:
+                return cls._get_rows(fields, window_limit, window)
+
+            for rows in map_concurrently(get_rows, batch):
+                for row in rows:
+                    rows_by_id.setdefault(row["id"], row)
+            if len(rows_by_id) >= limit:
+                break
+
+        return list(rows_by_id.values())[:limit]
+
+    @classmethod
+    def _get_time_windows(
+        cls,
+        search: Search,
+        start: datetime.datetime | None = None,
+        end: datetime.datetime | None = None,
+    ) -> list[Search]:
+        """
+        Splits `search` into searches that match at most SEARCH_MAX_RECORDS
+        each, by bisecting the Created_Time range for as long as
+        _has_more_than_max_records() says so. Nothing but those one-record
+        probes is fetched here.
+        """
+        time_search = search
+        if start is not None and end is not None:
+            time_search = search.copy().between("Created_Time", start.isoformat(), end.isoformat())
+        if not cls._has_more_than_max_records(time_search):
+            return [time_search]
+
+        if len(search.criteria) >= SEARCH_MAX_CRITERIA:
+            raise ValueError(
+                f"Search matches more than {SEARCH_MAX_RECORDS} records, and cannot be split on Created_Time since "
+                f"it already has {SEARCH_MAX_CRITERIA} criteria (the API maximum). Narrow it down or use bulk_read()."
+            )
+        start = start or SEARCH_MIN_CREATED_TIME
+        end = end or now().replace(microsecond=0)
+        if (end - start).total_seconds() < 2:
+            # More than 2000 records created within one second; give up.
+            logger.warning("More than %d records created at %s; only getting the first", SEARCH_MAX_RECORDS, start)
+            return [time_search]
+        middle = (start + (end - start) / 2).replace(microsecond=0)
+        return [
+            *cls._get_time_windows(search, start, middle),
+            *cls._get_time_windows(search, middle + datetime.timedelta(seconds=1), end),
+        ]
+
+    @classmethod
+    def _has_more_than_max_records(cls, search: Search) -> bool:
+        """
+        Whether `search` matches more records than the API lets us page
+        through, judging by the `more_records` flag on the very last
+        reachable record.
+        """
+        url = get_page_url(
+            url=cls._get_list_url(cls._get_api_url(), search),
+            get_params={"fields": "id"},
+            page=SEARCH_MAX_RECORDS,
+            per_page=1,
+        )
+        return ZohoRequestor.singleton().get(url=url).get("info", {}).get("more_records", False)
+
+    @classmethod
+    def _add_missing_id_results(cls, records: list[Self], results: list[BulkResult[Self]]) -> list[BulkResult[Self]]:
+        """
+        `results` are for those of `records` that have an id, in order. The
+        ones without an id get an error result in their place.
+        """
+        results_iter = iter(results)
+        return [
+            next(results_iter) if record.id else BulkResult(record=record, status="error", message="Record has no id")
+            for record in records
+        ]
+
+    @classmethod
+    async def _abulk_send(
+        cls,
+        records: list[Self],
+        send: Callable[[list[Self]], Awaitable[dict]],
+        resubmit_failed: bool = False,
+    ) -> list[BulkResult[Self]]:
+        """Async version of _bulk_send()."""
+        async def send_chunk(chunk: list[Self]) -> list[BulkResult[Self]]:
+            try:
+                return cls._handle_bulk_results(BulkResult.from_response(chunk, await send(chunk)))
+            except Exception as e:
+                return BulkResult.from_exception(chunk, e)
+
+        chunks = await asyncio.gather(*[send_chunk(chunk) for chunk in partition(records, 100)])
+        results = [result for chunk in chunks for result in chunk]
+
+        if resubmit_failed:
+            failed = [idx for idx, result in enumerate(results) if not result.ok]
+            if failed:
+                resubmitted = await cls._abulk_send([results[idx].record for idx in failed], send)
+                for idx, result in zip(failed, resubmitted):
+                    results[idx] = result
 
-        for partial_data in partition(records, 100):
-            json = {"data": [d.to_dict() for d in partial_data]}
+        return results
+
+    @classmethod
+    def _bulk_send(
+        cls,
+        records: list[Self],
+        send: Callable[[list[Self]], dict],
+        resubmit_failed: bool = False,
+    ) -> list[BulkResult[Self]]:
+        """
+        Sends `records` in chunks of 100 (concurrently, on at most
+        settings.max_concurrency threads) and returns one result per record,
+        in the same order. If `resubmit_failed`, the failed records are sent
+        once more and their results replaced.
+        """
+        def send_chunk(chunk: list[Self]) -> list[BulkResult[Self]]:
             try:
-                response = ZohoRequestor.singleton().put(url=cls._get_api_url(), json=json)
-                for row in response.get("data", []):
-                    if "details" in row and "id" in row["details"]:
-                        results.append(records[idx].with_id(row["details"]["id"]))
-                    else:
-                        results.append(records[idx])
-                    idx += 1
+                return cls._handle_bulk_results(BulkResult.from_response(chunk, send(chunk)))
             except Exception as e:
-                print(f"!!! Error: {e}")
+                return BulkResult.from_exception(chunk, e)
+
+        results = [result for chunk in map_concurrently(send_chunk, partition(records, 100)) for result in chunk]
+
+        if resubmit_failed:
+            failed = [idx for idx, result in enumerate(results) if not result.ok]
+            if failed:
+                resubmitted = cls._bulk_send([results[idx].record for idx in failed], send)
+                for idx, result in zip(failed, resubmitted):
+                    results[idx] = result
+
+        return results
 
+    @classmethod
+    def _handle_bulk_results(cls, results: list[BulkResult[Self]]) -> list[BulkResult[Self]]:
+        for result in results:
+            if result.ok and result.id:
+                result.record.with_id(result.id)
+        cls._invalidate_cache([result.id for result in results if result.ok and result.id])
         return results
 
     @classmethod
-    def bulk_upsert(cls, records: list[Self]) -> list[Self]:
-        results: list[Self] = []
-        idx = 0
+    def _invalidate_cache(cls, record_ids: list[str | None]):
+        if settings.record_cache is not None:
+            for record_id in record_ids:
+                if record_id:
+                    settings.record_cache.delete(cls.module, record_id)
+
+    @classmethod
+    async def abulk_delete(cls, records: list[Self]) -> list[BulkResult[Self]]:
+        from zoho.async_requestor import AsyncZohoRequestor
+
+        url = await cls._aget_api_url()
+
+        async def send(chunk: list[Self]) -> dict:
+            ids = ",".join(r.id for r in chunk if r.id)
+            return await AsyncZohoRequestor.singleton().delete(url=f"{url}?ids={ids}")
+
+        # Records without an id would be left out of the request, and shift
+        # the response rows of the rest of their chunk:
+        return cls._add_missing_id_results(records, await cls._abulk_send([r for r in records if r.id], send))
+
+    @classmethod
+    async def abulk_update(cls, records: list[Self], resubmit_failed: bool = False) -> list[BulkResult[Self]]:
+        from zoho.async_requestor import AsyncZohoRequestor
+
+        url = await cls._aget_api_url()
 
-        for partial_data in partition(records, 100):
-            response = ZohoRequestor.singleton().post(
-                url=f"{cls._get_api_url()}/upsert",
-                json={"data": [d.to_dict() for d in partial_data]},
+        async def send(chunk: list[Self]) -> dict:
+            return await AsyncZohoRequestor.singleton().put(
+                url=url,
+                json={"data": [r.to_dict() for r in chunk]},
+                cost=get_record_write_cost(len(chunk)),
             )
-            for row in response.get("data", []):
-                if "details" in row and "id" in row["details"]:
-                    results.append(records[idx].with_id(row["details"]["id"]))
-                idx += 1
 
-        return results
+        return await cls._abulk_send(records, send, resubmit_failed)
 
     @classmethod
-    def get(cls, record_id: str) -> Self | None:
-        response = ZohoRequestor.singleton().get(url=f"{cls._get_api_url()}/{record_id}")
+    async def abulk_upsert(cls, records: list[Self], resubmit_failed: bool = False) -> list[BulkResult[Self]]:
+        from zoho.async_requestor import AsyncZohoRequestor
+
+        url = f"{await cls._aget_api_url()}/upsert"
+
+        async def send(chunk: list[Self]) -> dict:
+            return await AsyncZohoRequestor.singleton().post(
+                url=url,
+                json={"data": [r.to_dict() for r in chunk]},
+                retry=True,
+                cost=get_record_write_cost(len(chunk)),
+            )
+
+        return await cls._abulk_send(records, send, resubmit_failed)
+
+    @classmethod
+    async def aget(cls, record_id: str) -> Self | None:
+        from zoho.async_requestor import AsyncZohoRequestor
+
+        cache = settings.record_cache
+        if cache is not None and (data := cache.get(cls.module, record_id)) is not None:
+            return cls.from_dict(data)
+        response = await AsyncZohoRequestor.singleton().get(url=f"{await cls._aget_api_url()}/{record_id}")
         if "data" in response and response["data"]:
+            if cache is not None:
+                cache.set(cls.module, record_id, response["data"][0])
             return cls.from_dict(response["data"][0])
         return None
 
     @classmethod
-    def list(
+    async def alist(
         cls,
         fields: list[str] | None = None,
         limit: int | None = None,
         search: Search | None = None,
         **kwargs,
     ) -> list[Self]:
-        """
-        @param kwargs Values that are lists will be searched for using the "in"
-        operator, all others with "equals".
-        """
+        """Async version of list()."""
+        from zoho.async_requestor import AsyncZohoRequestor
+
         limit = limit or settings.list_limit
         per_page = limit if limit and limit < 200 else 200
         fields = fields or cls.dict_keys()
-        records = []
-
-        if kwargs:
-            eq_kwargs = {k: v for k, v in kwargs.items() if not isinstance(v, list)}
-            in_kwargs = {k: v for k, v in kwargs.items() if isinstance(v, list)}
-            search = search or Search()
-            if eq_kwargs:
-                search = search.eq(**eq_kwargs)
-            if in_kwargs:
-                search = search.in_(**in_kwargs)
-
-        if search:
-            url = f"{cls._get_api_url()}/search?criteria={search()}"
-        else:
-            url = cls._get_api_url()
+        url = cls._get_list_url(await cls._aget_api_url(), search, **kwargs)
 
-        for field_list in partition(fields, 50):
-            records.append(
-                ZohoRequestor.singleton().get_list(
+        records = await asyncio.gather(
+            *[
+                AsyncZohoRequestor.singleton().get_list(
                     url=url,
                     get_params={"fields": ",".join(field_list)},
                     list_field="data",
                     limit=limit,
                     per_page=per_page,
                 )
+                for field_list in partition(fields, 50)
+            ]
+        )
+
+        return [cls.from_dict(row) for row in merge_dict_lists_by_id(list(records))]
+
+    @classmethod
+    def bulk_delete(cls, records: list[Self]) -> list[BulkResult[Self]]:
+        """
+        Deletes `records`, which must have their `id` set, 100 per request.
+        Returns one BulkResult per record, in the same order as `records`;
+        records without an id get an error result.
+        """
+        url = cls._get_api_url()
+        results = cls._bulk_send(
+            [r for r in records if r.id],
+            lambda chunk: ZohoRequestor.singleton().delete(url=f"{url}?ids={','.join(r.id for r in chunk if r.id)}"),
+        )
+        return cls._add_missing_id_results(records, results)
+
+    @classmethod
+    def bulk_read(
+        cls,
+        fields: list[str] | None = None,
+        limit: int | None = None,
+        search: Search | None = None,
+        **kwargs,
+    ) -> Iterator[Self]:
+        """
+        Exports records through the Bulk Read API, which costs a handful of
+        API calls per 200,000 records instead of one per 200. Each job's
+        zipped CSV is downloaded to a temporary file and decoded one row at a
+        time; if there are more records, the next job is started when the
+        previous result has been consumed.
+
+        Lookup fields only get their id set, since that is all the CSV has.
+
+        @param limit Max number of records to return. Default is all of them
+        (settings.list_limit does not apply here).
+        @param kwargs Same as for list().
+        """
+        search = cls._get_search(search, **kwargs)
+        criteria = search.bulk_criteria() if search else None
+        # The id is always included (as "Id"), and may not be requested:
+        fields = [f for f in fields or [c.dict_key for c in cls.get_field_codecs() if c.field.init] if f != "id"]
+        convert = get_csv_converter(cls)
+        page = 1
+        count = 0
+
+        while True:
+            job = wait_for_job("read", create_read_job(cls.module, fields, criteria, page))
+            with download_result(job) as file:
+                for row in iter_csv_rows(file):
+                    yield cls.from_dict(convert(row))
+                    count += 1
+                    if limit and count >= limit:
+                        return
+            if not job["result"].get("more_records", False):
+                return
+            page += 1
+
+    @classmethod
+    def bulk_update(cls, records: list[Self], resubmit_failed: bool = False) -> list[BulkResult[Self]]:
+        """
+        Returns one BulkResult per record, in the same order as `records`.
+        Successfully updated records also get their `id` set.
+
+        @param resubmit_failed Send the records that failed once more.
+        """
+        url = cls._get_api_url()
+        return cls._bulk_send(
+            records,
+            lambda chunk: ZohoRequestor.singleton().put(
+                url=url,
+                json={"data": [r.to_dict() for r in chunk]},
+                cost=get_record_write_cost(len(chunk)),
+            ),
+            resubmit_failed,
+        )
+
+    @classmethod
+    def bulk_upsert(cls, records: list[Self], resubmit_failed: bool = False) -> list[BulkResult[Self]]:
+        """
+        Returns one BulkResult per record, in the same order as `records`.
+        Successfully upserted records also get their `id` set.
+
+        @param resubmit_failed Send the records that failed once more.
+        """
+        url = f"{cls._get_api_url()}/upsert"
+        return cls._bulk_send(
+            records,
+            lambda chunk: ZohoRequestor.singleton().post(
+                url=url,
+                json={"data": [r.to_dict() for r in chunk]},
+                retry=True,
+                cost=get_record_write_cost(len(chunk)),
+            ),
+            resubmit_failed,
+        )
+
+    @classmethod
+    def bulk_write(
+        cls,
+        records: list[Self],
+        operation: str = "upsert",
+        find_by: str | None = None,
+    ) -> list[BulkResult[Self]]:
+        """
+        Like bulk_upsert(), but through the Bulk Write API: records are sent
+        as zipped CSV files of up to 25,000 rows, each processed by one job,
+        which makes for a handful of API calls instead of one per 100
+        records. Jobs run concurrently on at most settings.max_concurrency
+        threads. Empty values are ignored, i.e. they do not clear existing
+        ones, and Tag is not written.
+
+        Requires settings.org_id to be set.
+
+        @param operation "insert", "update", or "upsert".
+        @param find_by API name of the unique field used to match existing
+        records (required for "update"). For "upsert", the default is the
+        module's duplicate check fields.
+        """
+        def write_chunk(chunk: list[Self]) -> list[BulkResult[Self]]:
+            try:
+                rows = run_write_job(cls.module, cls, [r.to_dict() for r in chunk], operation, find_by)
+                return cls._handle_bulk_results(BulkResult.from_bulk_write(chunk, rows))
+            except Exception as e:
+                return BulkResult.from_exception(chunk, e)
+
+        return [
+            result
+            for chunk in map_concurrently(write_chunk, partition(records, BULK_WRITE_MAX_ROWS))
+            for result in chunk
+        ]
+
+    @classmethod
+    def get(cls, record_id: str) -> Self | None:
+        """Uses settings.record_cache, if set."""
+        cache = settings.record_cache
+        if cache is not None and (data := cache.get(cls.module, record_id)) is not None:
+            return cls.from_dict(data)
+        response = ZohoRequestor.singleton().get(url=f"{cls._get_api_url()}/{record_id}")
+        if "data" in response and response["data"]:
+            if cache is not None:
+                cache.set(cls.module, record_id, response["data"][0])
+            return cls.from_dict(response["data"][0])
+        return None
+
+    @classmethod
+    def _iter_rows(
+        cls,
+        fields: list[str] | None = None,
+        limit: int | None = None,
+        search: Search | None = None,
+        prefetch: int | None = None,
+        get_params: dict | None = None,
+        headers: dict[str, str] | None = None,
+        **kwargs,
+    ) -> Iterator[list[dict]]:
+        """
+        Yields pages of raw row dicts, merged across field partitions.
+        Searches are split up like in list(), and the resulting searches are
+        paged through one after another, skipping records already yielded.
+        """
+        fields = fields or cls.dict_keys()
+        search = cls._get_search(search, **kwargs)
+        limit = cls._get_list_limit(limit, search)
+
+        if search and (search.needs_sharding() or limit > SEARCH_MAX_RECORDS):
+            seen_ids: set[str] = set()
+            for shard in search.shard():
+                for window in cls._get_time_windows(shard):
+                    for rows in cls._iter_search_rows(
+                        fields,
+                        min(limit - len(seen_ids), SEARCH_MAX_RECORDS),
+                        window,
+                        prefetch=prefetch,
+                        get_params=get_params,
+                        headers=headers,
+                    ):
+                        rows = [row for row in rows if row["id"] not in seen_ids][:limit - len(seen_ids)]
+                        seen_ids.update(row["id"] for row in rows)
+                        if rows:
+                            yield rows
+                        if len(seen_ids) >= limit:
+                            return
+        else:
+            yield from cls._iter_search_rows(
+                fields, limit, search, prefetch=prefetch, get_params=get_params, headers=headers
             )
 
-        return [cls.from_dict(row) for row in zip_dict_lists(records)]
+    @classmethod
+    def _iter_search_rows(
+        cls,
+        fields: list[str],
+        limit: int,
+        search: Search | None,
+        *,
+        prefetch: int | None = None,
+        get_params: dict | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> Iterator[list[dict]]:
+        per_page = limit if limit < 200 else 200
+        url = cls._get_list_url(cls._get_api_url(), search)
+        page_iterators = [
+            ZohoRequestor.singleton().iter_pages(
+                url=url,
+                get_params={**(get_params or {}), "fields": ",".join(field_list)},
+                list_field="data",
+                limit=limit,
+                per_page=per_page,
+                prefetch=prefetch,
+                headers=headers,
+            )
+            for field_list in partition(fields, 50)
+        ]
+
+        yield from iter_merged_pages_by_id(page_iterators)
+
+    @classmethod
+    def iter(
+        cls,
+        fields: list[str] | None = None,
+        limit: int | None = None,
+        search: Search | None = None,
+        prefetch: int | None = None,
+        **kwargs,
+    ) -> Iterator[Self]:
+        """
+        Generator version of list(). Records are fetched and decoded one page
+        at a time, so memory use stays constant regardless of module size.
+
+        @param prefetch Number of pages to fetch ahead in the background
+        while the current one is decoded. Defaults to settings.prefetch_pages.
+        """
+        for rows in cls._iter_rows(fields=fields, limit=limit, search=search, prefetch=prefetch, **kwargs):
+            for row in rows:
+                yield cls.from_dict(row)
+
+    @classmethod
+    def list(
+        cls,
+        fields: list[str] | None = None,
+        limit: int | None = None,
+        search: Search | None = None,
+        **kwargs,
+    ) -> list[Self]:
+        """
+        Fields are fetched in partitions of 50 (the API maximum), which run
+        concurrently on at most settings.max_concurrency threads and are
+        then merged on record id.
+
+        Searches that the API cannot do in one go are split up: "in"
+        criteria with more than 100 values are divided between several
+        searches, and searches that match more than the API's cap of 2000
+        records are split further on Created_Time (if `limit` is above that
+        cap). These run concurrently and their results are de-duplicated by
+        id. iter() and list_columns() split searches the same way, but go
+        through the parts one at a time.
+
+        @param limit Defaults to settings.list_limit, or to no limit for
+        searches with "in" criteria of more than 100 values.
+        @param kwargs Values that are lists will be searched for using the "in"
+        operator, all others with "equals".
+        """
+        fields = fields or cls.dict_keys()
+        search = cls._get_search(search, **kwargs)
+        limit = cls._get_list_limit(limit, search)
+
+        if search and (search.needs_sharding() or limit > SEARCH_MAX_RECORDS):
+            rows = cls._get_sharded_rows(fields, limit, search)
+        else:
+            rows = cls._get_rows(fields, limit, search)
+
+        return [cls.from_dict(row) for row in rows]
+
+    @classmethod
+    def list_columns(
+        cls,
+        fields: List[str] | None = None,
+        limit: int | None = None,
+        search: Search | None = None,
+        prefetch: int | None = None,
+        **kwargs,
+    ) -> "RecordColumns":
+        """
+        Like list(), but returns a zoho.columns.RecordColumns with one typed
+        NumPy array per field instead of record objects. Requires `numpy`.
+        """
+        from zoho.columns import RecordColumns
+
+        columns = RecordColumns(cls, fields)
+        for rows in cls._iter_rows(fields=fields, limit=limit, search=search, prefetch=prefetch, **kwargs):
+            columns.append_rows(rows)
+        return columns
+
+    @classmethod
+    def query(cls, *fields: str) -> "Query[Self]":
+        """
+        COQL query for this module, selecting `fields` (default: all). See
+        zoho.coql.Query.
+        """
+        from zoho.coql import Query
+
+        return Query(cls, list(fields))
 
     def update(self):
         ZohoRequestor.singleton().put(url=self._get_api_url(), json={"data": [self.to_dict()]})
+        self._invalidate_cache([self.id])
 
 
 @dataclass
 class AbstractTaggedModuleRecord(AbstractModuleRecord, ABC):
-    Tag: list[ZohoTag] = field(default_factory=list)
+    Tag: list[ZohoTag] = field(default_factory=list, kw_only=True)
+
+    @classmethod
+    def _send_tag_action(cls, action: str, records: list[Self], tags: list[ZohoTag]) -> list[BulkResult[Self]]:
+        url = f"{cls._get_api_url()}/actions/{action}"
+        tag_data = [{"name": tag.name, **({"id": tag.id} if tag.id else {})} for tag in tags]
+        # Like in bulk_delete(), records without an id are not sent:
+        results = cls._bulk_send(
+            [r for r in records if r.id],
+            lambda chunk: ZohoRequestor.singleton().post(
+                url=url,
+                json={"tags": tag_data, "ids": [r.id for r in chunk], "over_write": False},
+                retry=True,
+            ),
+        )
+        return cls._add_missing_id_results(records, results)
+
+    @classmethod
+    def bulk_add_tags(cls, records: list[Self], tags: list[ZohoTag]) -> list[BulkResult[Self]]:
+        """
+        Adds `tags` to `records` through the add_tags action, which only
+        needs the record ids, in concurrent chunks of 100. Returns one
+        BulkResult per record, in the same order. The Tag lists of the
+        successfully tagged records are updated to match.
+        """
+        results = cls._send_tag_action("add_tags", records, tags)
+        for result in results:
+            if result.ok:
+                names = {tag.name for tag in result.record.Tag}
+                result.record.Tag.extend(tag for tag in tags if tag.name not in names)
+        return results
+
+    @classmethod
+    def bulk_remove_tags(cls, records: list[Self], tags: list[ZohoTag]) -> list[BulkResult[Self]]:
+        """Counterpart of bulk_add_tags(), using the remove_tags action."""
+        results = cls._send_tag_action("remove_tags", records, tags)
+        names = {tag.name for tag in tags}
+        for result in results:
+            if result.ok:
+                result.record.Tag = [tag for tag in result.record.Tag if tag.name not in names]
+        return results
 
     @classmethod
     def bulk_tag(cls, objs: list[Self], tags: list[ZohoTag]) -> list[Self]:
@@ -127,6 +716,11 @@ class AbstractTaggedModuleRecord(AbstractModuleRecord, ABC):
             for obj in untagged_objs
         ]
         for partial in partition(data, 100):
-            ZohoRequestor.singleton().put(url=cls._get_api_url(), json={"data": partial})
+            ZohoRequestor.singleton().put(
+                url=cls._get_api_url(),
+                json={"data": partial},
+                cost=get_record_write_cost(len(partial)),
+            )
+        cls._invalidate_cache([obj.id for obj in untagged_objs])
         tagged_objs.extend(obj.copy(Tag=list(set(obj.Tag).union(tags))) for obj in untagged_objs)
         return tagged_objs
@@ -0,0 +1,97 @@
+from dataclasses import dataclass, field
+from typing import Any, Generic, Self, TypeVar
+
+from zoho.exceptions import ZohoHTTPError
+
+
+_T = TypeVar("_T")
+
+
+@dataclass
+class BulkResult(Generic[_T]):
+    """
+    Outcome for one record of a bulk operation. `status` is "success" or
+    "error" as reported by the API; `code` and `message` are the API's (or,
+    if the whole request failed, taken from the exception).
+    """
+    record: _T
+    status: str
+    id: str | None = None
+    code: str | None = None
+    message: str | None = None
+    details: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "success"
+
+    @classmethod
+    def from_bulk_write(cls, records: list[_T], rows: list[dict[str, str]]) -> list[Self]:
+        """
+        `rows` are the rows of a Bulk Write job's result file, in the same
+        order as `records`.
+        """
+        results: list[Self] = []
+
+        for idx, record in enumerate(records):
+            if idx >= len(rows):
+                results.append(cls(record=record, status="error", message="No result returned for record"))
+                continue
+            row = rows[idx]
+            row_status = row.get("STATUS", None) or None
+            results.append(
+                cls(
+                    record=record,
+                    status="success" if row_status in ("ADDED", "UPDATED") else "error",
+                    id=row.get("ID", None) or None,
+                    code=row_status,
+                    message=row.get("ERRORS", None) or None,
+                )
+            )
+
+        return results
+
+    @classmethod
+    def from_exception(cls, records: list[_T], exception: Exception) -> list[Self]:
+        """
+        Error results for a whole chunk. If it was an HTTP error whose body
+        still has one row per record (as for 400 responses to bulk writes),
+        those rows are used instead.
+        """
+        if isinstance(exception, ZohoHTTPError):
+            body = exception.json()
+            if isinstance(body, dict) and len(body.get("data", [])) == len(records):
+                return cls.from_response(records, body)
+            return [
+                cls(record=record, status="error", code=exception.code, message=exception.message or str(exception))
+                for record in records
+            ]
+        return [cls(record=record, status="error", message=str(exception)) for record in records]
+
+    @classmethod
+    def from_response(cls, records: list[_T], response: dict, list_field: str = "data") -> list[Self]:
+        """
+        `records` is the chunk that was sent; the response rows come back in
+        the same order.
+        """
+        rows = response.get(list_field, [])
+        results: list[Self] = []
+
+        for idx, record in enumerate(records):
+            if idx >= len(rows):
+                results.append(cls(record=record, status="error", message="No result returned for record"))
+                continue
+            row = rows[idx]
+            details = row.get("details", {}) or {}
+            results.append(
+                cls(
+                    record=record,
+                    status=row.get("status", "success" if "id" in details else "error"),
+                    id=details.get("id", None),
+                    code=row.get("code", None),
+                    message=row.get("message", None),
+                    details=details,
+                )
+            )
+
+        return results
@@ -1,13 +1,67 @@
+import threading
+import time
 from dataclasses import dataclass
-from typing import List, Self
-
-from klaatu_python.utils import getitem0_nullable
+from typing import Generic, Iterable, List, Self, TypeVar
 
 from zoho.records.base import AbstractIDRecord
 from zoho.requestor import ZohoRequestor
+from zoho.settings import settings
 from zoho.types import ColorCode
 
 
+_T = TypeVar("_T", bound="Tag")
+
+
+class TagRegistry(Generic[_T]):
+    """
+    Cached tags of one module, indexed by name and id. Expires
+    settings.tag_registry_ttl seconds after it was last loaded, or when
+    invalidate() is called; Tag.list() reloads it, and Tag.bulk_create()
+    adds to it.
+    """
+    def __init__(self, module: str):
+        self.module = module
+        self._by_id: dict[str, _T] = {}
+        self._by_name: dict[str, _T] = {}
+        self._loaded_at: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < settings.tag_registry_ttl
+
+    def add(self, tags: Iterable[_T]):
+        with self._lock:
+            for tag in tags:
+                self._by_name[tag.name] = tag
+                if tag.id:
+                    self._by_id[tag.id] = tag
+
+    def get_by_id(self, tag_id: str) -> _T | None:
+        return self._by_id.get(tag_id, None)
+
+    def get_by_name(self, name: str) -> _T | None:
+        return self._by_name.get(name, None)
+
+    def invalidate(self):
+        with self._lock:
+            self._loaded_at = None
+
+    def load(self, tags: Iterable[_T]):
+        """Replaces the contents with `tags`."""
+        tags = list(tags)
+        with self._lock:
+            self._by_name = {tag.name: tag for tag in tags}
+            self._by_id = {tag.id: tag for tag in tags if tag.id}
+            self._loaded_at = time.monotonic()
+
+    def tags(self) -> list[_T]:
+        return list(self._by_name.values())
+
+
+_tag_registries: dict[str, TagRegistry] = {}
+
+
 @dataclass
 class Tag(AbstractIDRecord):
     name: str
@@ -16,34 +70,107 @@ class Tag(AbstractIDRecord):
     def __hash__(self) -> int:
         return hash((self.id, self.name, self.color_code))
 
+    @classmethod
+    async def _aget_api_url(cls, module: str):
+        from zoho.async_requestor import AsyncZohoRequestor
+
+        token = await AsyncZohoRequestor.singleton().get_token()
+        return f"{token.api_domain}/crm/v5/settings/tags?module={module}"
+
+    @classmethod
+    def _find_in_registry(cls, module: str, names: List[str]) -> tuple[List[Self], List[str]]:
+        """Returns the found tags and the names that were not found."""
+        registry = cls.registry(module)
+        tags: List[Self] = []
+        missing_names: List[str] = []
+
+        for name in dict.fromkeys(names):
+            tag = registry.get_by_name(name)
+            if tag is None:
+                missing_names.append(name)
+            else:
+                tags.append(tag)
+
+        return tags, missing_names
+
     @classmethod
     def _get_api_url(cls, module: str):
         return f"{ZohoRequestor.singleton().token.api_domain}/crm/v5/settings/tags?module={module}"
 
     @classmethod
-    def bulk_create(cls, module: str, tags: list[Self]) -> list[Self]:
-        response = ZohoRequestor.singleton().post(
-            url=cls._get_api_url(module),
-            json={"tags": [t.to_dict() for t in tags]},
-        )
-        created: list[Tag] = []
+    def _handle_create_response(cls, module: str, tags: list[Self], response: dict) -> list[Self]:
+        created: list[Self] = []
 
         for idx, row in enumerate(response.get("tags", [])):
             tag_id = row.get("details", {}).get("id", None)
             if tag_id:
                 created.append(
-                    Tag(
+                    cls(
                         id=tag_id,
                         name=tags[idx].name,
                         color_code=tags[idx].color_code,
                     )
                 )
 
+        cls.registry(module).add(created)
         return created
 
+    @classmethod
+    async def abulk_create(cls, module: str, tags: list[Self]) -> list[Self]:
+        from zoho.async_requestor import AsyncZohoRequestor
+
+        response = await AsyncZohoRequestor.singleton().post(
+            url=await cls._aget_api_url(module),
+            json={"tags": [t.to_dict() for t in tags]},
+        )
+        return cls._handle_create_response(module, tags, response)
+
+    @classmethod
+    async def alist(cls, module: str) -> list[Self]:
+        from zoho.async_requestor import AsyncZohoRequestor
+
+        rows = await AsyncZohoRequestor.singleton().get_list(url=await cls._aget_api_url(module), list_field="tags")
+        tags = [cls.from_dict(row) for row in rows]
+        cls.registry(module).load(tags)
+        return tags
+
+    @classmethod
+    async def alist_or_create(
+        cls,
+        module: str,
+        names: List[str],
+        default_color_code: ColorCode = "#658BA8",
+    ) -> List[Self]:
+        was_loaded = cls.registry(module).is_loaded
+        if not was_loaded:
+            await cls.alist(module)
+        tags, missing_names = cls._find_in_registry(module, names)
+
+        if missing_names and was_loaded:
+            # They may have been created elsewhere since the registry loaded:
+            await cls.alist(module)
+            tags, missing_names = cls._find_in_registry(module, names)
+
+        if missing_names:
+            unsaved_tags = [cls(id=None, name=name, color_code=default_color_code) for name in missing_names]
+            tags.extend(await cls.abulk_create(module, unsaved_tags))
+
+        return tags
+
+    @classmethod
+    def bulk_create(cls, module: str, tags: list[Self]) -> list[Self]:
+        response = ZohoRequestor.singleton().post(
+            url=cls._get_api_url(module),
+            json={"tags": [t.to_dict() for t in tags]},
+        )
+        return cls._handle_create_response(module, tags, response)
+
     @classmethod
     def get(cls, module: str, name: str) -> Self | None:
-        return getitem0_nullable(cls.list(module), cond=lambda t: t.name == name)
+        """Looked up in the module's registry, which is loaded if needed."""
+        if not cls.registry(module).is_loaded:
+            cls.list(module)
+        return cls.registry(module).get_by_name(name)
 
     @classmethod
     def get_or_create(cls, module: str, name: str, default_color_code: ColorCode = "#658BA8") -> Self:
@@ -51,18 +178,40 @@ class Tag(AbstractIDRecord):
 
     @classmethod
     def list(cls, module: str) -> list[Self]:
-        return [
+        """Always fetches the tags, and reloads the module's registry."""
+        tags = [
             cls.from_dict(row)
             for row in ZohoRequestor.singleton().get_list(url=cls._get_api_url(module), list_field="tags")
         ]
+        cls.registry(module).load(tags)
+        return tags
 
     @classmethod
     def list_or_create(cls, module: str, names: List[str], default_color_code: ColorCode = "#658BA8") -> List[Self]:
-        tags = [t for t in cls.list(module) if t.name in names]
-        missing_names = [n for n in names if n not in [tag.name for tag in tags]]
+        """
+        Tags are looked up in the module's registry. If some are missing
+        from an already loaded registry, it is reloaded once before they are
+        created, in case they were created elsewhere in the meantime.
+        """
+        was_loaded = cls.registry(module).is_loaded
+        if not was_loaded:
+            cls.list(module)
+        tags, missing_names = cls._find_in_registry(module, names)
+
+        if missing_names and was_loaded:
+            cls.list(module)
+            tags, missing_names = cls._find_in_registry(module, names)
 
         if missing_names:
-            unsaved_tags = [Tag(id=None, name=name, color_code=default_color_code) for name in missing_names]
+            unsaved_tags = [cls(id=None, name=name, color_code=default_color_code) for name in missing_names]
             tags.extend(cls.bulk_create(module, unsaved_tags))
 
         return tags
+
+    @classmethod
+    def registry(cls, module: str) -> TagRegistry[Self]:
+        """The module's registry; it is not loaded by this method."""
+        registry = _tag_registries.get(module)
+        if registry is None:
+            registry = _tag_registries.setdefault(module, TagRegistry(module))
+        return registry
@@ -1,18 +1,25 @@
 import logging
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, nullcontext
 from enum import Enum
-from typing import Self
+from typing import IO, Callable, Iterator, Self
 from urllib.parse import urlencode
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from zoho.exceptions import ZohoHTTPError
+from zoho.json_codec import get_json_codec
 from zoho.oauth2 import (
     ZohoOAuth2Token,
     get_oauth2_token_from_auth_code,
     get_oauth2_token_from_refresh_token,
 )
+from zoho.ratelimit import RateLimiter, get_backoff_delay
 from zoho.settings import settings
-from zoho.utils import now
+from zoho.utils import iter_prefetched
 
 
 logger = logging.getLogger(__name__)
@@ -25,23 +32,91 @@ class HTTPMetod(Enum):
     PUT = "put"
 
 
+IDEMPOTENT_METHODS = (HTTPMetod.GET, HTTPMetod.PUT, HTTPMetod.DELETE)
+
+
+def get_page_url(
+    url: str,
+    page: int,
+    get_params: dict | None = None,
+    next_page_token: str | None = None,
+    per_page: int | None = None,
+) -> str:
+    """
+    URL for one page of a paginated listing. Uses `next_page_token` if it is
+    set, otherwise `page` and `per_page`.
+    """
+    final_get_params = (get_params or {}).copy()
+    if next_page_token:
+        final_get_params["page_token"] = next_page_token
+    else:
+        if per_page:
+            final_get_params["per_page"] = per_page
+        final_get_params["page"] = page
+    if final_get_params:
+        url += "&" if "?" in url else "?"
+        url += urlencode(final_get_params, safe=",")
+    return url
+
+
 class ZohoRequestor:
     _token: ZohoOAuth2Token
     _instance: Self
+    _rate_limiter: RateLimiter | None = None
+    _session: requests.Session | None = None
+
+    def __init__(self):
+        self._token_lock = threading.Lock()
+        self._refresh_thread: threading.Thread | None = None
+        self._refresh_thread_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        """
+        Shared by all callers of this requestor (and so, in practice, by
+        everyone using the singleton).
+        """
+        if self._rate_limiter is None:
+            self._rate_limiter = RateLimiter.from_settings()
+        return self._rate_limiter
+
+    @rate_limiter.setter
+    def rate_limiter(self, value: RateLimiter):
+        self._rate_limiter = value
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        Lazily created session, so that all requests made by this requestor
+        share one pool of keep-alive connections to the API domain.
+        """
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=settings.pool_size, pool_maxsize=settings.pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+            self._session = session
+        return self._session
 
     @property
     def token(self) -> ZohoOAuth2Token:
-        if not hasattr(self, "_token") or self._token.expires < now():
-            if not settings.client_id or not settings.client_secret:
-                raise ValueError("settings.client_id and settings.client_secret must be set.")
-            if settings.refresh_token:
-                self._token = get_oauth2_token_from_refresh_token(settings.refresh_token)
-            elif settings.auth_code:
-                self._token = get_oauth2_token_from_auth_code(settings.auth_code)
-            else:
-                raise ValueError("settings.refresh_token or settings.auth_code must be set.")
-
-        return self._token
+        """
+        Refreshed in a background thread when it has less than
+        settings.token_refresh_margin seconds left, so requests normally
+        don't have to wait for it. Only if it has actually expired does the
+        caller refresh it (or wait for the ongoing refresh).
+        """
+        token = self.get_valid_token()
+        if token is None:
+            token = self._refresh_token(margin=0)
+        return token
 
     @classmethod
     def singleton(cls):
@@ -49,11 +124,199 @@ class ZohoRequestor:
             cls._instance = cls()
         return cls._instance
 
-    def delete(self, url: str) -> dict:
-        return self.request(url=url, method=HTTPMetod.DELETE)
+    def _fetch_token(self) -> ZohoOAuth2Token:
+        if not settings.client_id or not settings.client_secret:
+            raise ValueError("settings.client_id and settings.client_secret must be set.")
+        if settings.refresh_token:
+            return get_oauth2_token_from_refresh_token(settings.refresh_token)
+        if settings.auth_code:
+            return get_oauth2_token_from_auth_code(settings.auth_code)
+        raise ValueError("settings.refresh_token or settings.auth_code must be set.")
+
+    def _refresh_token(self, margin: float) -> ZohoOAuth2Token:
+        """
+        Single-flight refresh: concurrent callers (and, through the token
+        store's lock, other processes) wait for the one that is refreshing,
+        and then use its token instead of fetching their own.
+        """
+        store = settings.token_store
+
+        with self._token_lock:
+            token: ZohoOAuth2Token | None = getattr(self, "_token", None)
+            if token is not None and token.is_valid(margin):
+                return token
+
+            with store.lock() if store is not None else nullcontext():
+                stored = store.get() if store is not None else None
+                if stored is not None and stored.is_valid(margin):
+                    token = stored
+                else:
+                    token = self._fetch_token()
+                    if store is not None:
+                        store.set(token)
+
+            self._token = token
+            return token
 
-    def get(self, url: str) -> dict:
-        return self.request(url=url, method=HTTPMetod.GET)
+    def _refresh_token_in_background(self):
+        def refresh():
+            try:
+                self._refresh_token(margin=settings.token_refresh_margin)
+            except Exception as e:
+                logger.warning("Background token refresh failed: %s", e)
+
+        with self._refresh_thread_lock:
+            if self._refresh_thread is None or not self._refresh_thread.is_alive():
+                self._refresh_thread = threading.Thread(target=refresh, daemon=True)
+                self._refresh_thread.start()
+
+    def _iter_pages(
+        self,
+        url: str,
+        list_field: str,
+        get_params: dict | None,
+        per_page: int | None,
+        limit: int,
+        use_page_tokens: bool,
+        timeout: float | None,
+        page: int,
+        page_token: str | None,
+        item_count: int,
+        headers: dict[str, str] | None = None,
+    ) -> Iterator[list[dict]]:
+        more_items = True
+        next_page_token = page_token
+        first_page = page
+
+        while more_items:
+            page_url = get_page_url(
+                url=url,
+                get_params=get_params,
+                page=page,
+                next_page_token=next_page_token if use_page_tokens else None,
+                per_page=per_page,
+            )
+            try:
+                response = self.get(url=page_url, timeout=timeout, headers=headers)
+            except Exception as e:
+                if page > first_page:
+                    # Where to resume from. The exception keeps its type, so
+                    # it is still caught by the usual handlers.
+                    vars(e).update(
+                        page=page,
+                        page_token=next_page_token if use_page_tokens else None,
+                        item_count=item_count,
+                    )
+                raise
+            items = response.get(list_field, [])[:limit - item_count]
+            item_count += len(items)
+            info = response.get("info", {})
+            more_items = info.get("more_records", False) and item_count < limit
+            next_page_token = info.get("next_page_token", None)
+            page += 1
+            if items:
+                yield items
+
+    def _send(
+        self,
+        method: HTTPMetod,
+        url: str,
+        send: Callable[[], requests.Response],
+        retry: bool,
+        cost: float = 1,
+    ) -> requests.Response:
+        """
+        Calls `send` through the rate limiter, retrying on 429 and, if
+        `retry`, on connection errors, timeouts and 5xx responses (see
+        request()). Responses that are retried are closed.
+        """
+        rate_limited = 0
+        retries = 0
+
+        while True:
+            try:
+                with self.rate_limiter.acquire(cost):
+                    response = send()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not retry or retries >= settings.max_retries:
+                    raise
+                retries += 1
+                delay = get_backoff_delay(retries)
+                logger.warning("%s %s: %s; retrying in %.1f s", method.name, url, e, delay)
+                time.sleep(delay)
+                continue
+
+            # On 429, this blocks all callers for as long as the server says:
+            self.rate_limiter.update(response.status_code, response.headers)
+            if response.status_code == 429 and rate_limited < settings.rate_limit_retries:
+                rate_limited += 1
+                response.close()
+                continue
+            if response.status_code >= 500 and retry and retries < settings.max_retries:
+                retries += 1
+                delay = get_backoff_delay(retries)
+                logger.warning("%s %s: %d; retrying in %.1f s", method.name, url, response.status_code, delay)
+                response.close()
+                time.sleep(delay)
+                continue
+            return response
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def delete(self, url: str, timeout: float | None = None) -> dict:
+        return self.request(url=url, method=HTTPMetod.DELETE, timeout=timeout)
+
+    def download(self, url: str, timeout: float | None = None) -> IO[bytes]:
+        """
+        Streams the response body into a temporary file, which is kept in
+        memory up to settings.download_spool_size bytes and on disk beyond
+        that. The file is returned rewound; close it when done.
+
+        Retried like a GET through request(), and the whole download is
+        also retried if the connection breaks while streaming.
+        """
+        def send() -> requests.Response:
+            return self.session.get(
+                url=url,
+                headers={"Authorization": f"{self.token.token_type} {self.token.access_token}"},
+                timeout=timeout or settings.request_timeout,
+                stream=True,
+            )
+
+        retries = 0
+
+        with ExitStack() as stack:
+            file = stack.enter_context(tempfile.SpooledTemporaryFile(max_size=settings.download_spool_size))
+            while True:
+                with self._send(HTTPMetod.GET, url, send, retry=True) as response:
+                    ZohoHTTPError.raise_for_status(response)
+                    file.seek(0)
+                    file.truncate()
+                    size = 0
+                    try:
+                        for chunk in response.iter_content(chunk_size=64 * 1024):
+                            file.write(chunk)
+                            size += len(chunk)
+                        break
+                    except (requests.ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
+                        if retries >= settings.max_retries:
+                            raise
+                        retries += 1
+                        delay = get_backoff_delay(retries)
+                        logger.warning("GET %s: %s while downloading; retrying in %.1f s", url, e, delay)
+                time.sleep(delay)
+            # Only closed here if the download failed:
+            stack.pop_all()
+
+        logger.info("GET %s: %d, %d bytes downloaded", url, response.status_code, size)
+        file.seek(0)
+        return file  # type: ignore
+
+    def get(self, url: str, timeout: float | None = None, headers: dict[str, str] | None = None) -> dict:
+        return self.request(url=url, method=HTTPMetod.GET, timeout=timeout, headers=headers)
 
     def get_list(
         self,
@@ -63,53 +326,176 @@ class ZohoRequestor:
         per_page: int | None = None,
         limit: int | None = None,
         use_page_tokens: bool = True,
+        timeout: float | None = None,
+        prefetch: int | None = None,
+        page: int = 1,
+        page_token: str | None = None,
+        item_count: int = 0,
     ) -> list[dict]:
-        limit = limit or settings.list_limit
-        more_items = True
-        next_page_token = None
-        page = 1
-        base_url = url
-        base_get_params = (get_params or {}).copy()
-        items = []
+        items: list[dict] = []
 
-        while more_items:
-            final_get_params = base_get_params.copy()
-            if next_page_token and use_page_tokens:
-                final_get_params["page_token"] = next_page_token
-            else:
-                if per_page:
-                    final_get_params["per_page"] = per_page
-                final_get_params["page"] = page
-            url = base_url
-            if final_get_params:
-                if "?" in url:
-                    url += "&"
-                else:
-                    url += "?"
-                url += urlencode(final_get_params, safe=',')
-            response = self.get(url=url)
-            items.extend(response.get(list_field, []))
-            info = response.get("info", {})
-            more_items = info.get("more_records", False) and (limit is None or len(items) < limit)
-            next_page_token = info.get("next_page_token", None)
-            page += 1
+        try:
+            for page_items in self.iter_pages(
+                url=url,
+                list_field=list_field,
+                get_params=get_params,
+                per_page=per_page,
+                limit=limit,
+                use_page_tokens=use_page_tokens,
+                timeout=timeout,
+                prefetch=prefetch,
+                page=page,
+                page_token=page_token,
+                item_count=item_count,
+            ):
+                items.extend(page_items)
+        except Exception as e:
+            if "page" in vars(e):
+                vars(e)["items"] = items
+            raise
 
         return items
 
-    def post(self, url: str, json: dict | None = None) -> dict:
-        return self.request(url=url, method=HTTPMetod.POST, json=json or {})
+    def get_valid_token(self) -> ZohoOAuth2Token | None:
+        """
+        The current token if it hasn't expired, else None. Starts a
+        background refresh if it has less than settings.token_refresh_margin
+        seconds left.
+        """
+        token: ZohoOAuth2Token | None = getattr(self, "_token", None)
+        if token is None or not token.is_valid():
+            return None
+        if not token.is_valid(settings.token_refresh_margin):
+            self._refresh_token_in_background()
+        return token
+
+    def iter_list(
+        self,
+        url: str,
+        list_field: str,
+        get_params: dict | None = None,
+        per_page: int | None = None,
+        limit: int | None = None,
+        use_page_tokens: bool = True,
+        timeout: float | None = None,
+        prefetch: int | None = None,
+        page: int = 1,
+        page_token: str | None = None,
+        item_count: int = 0,
+    ) -> Iterator[dict]:
+        """
+        Like get_list(), but yields the items one at a time, only holding one
+        page in memory (plus `prefetch` pages, see iter_pages()).
+        """
+        for items in self.iter_pages(
+            url=url,
+            list_field=list_field,
+            get_params=get_params,
+            per_page=per_page,
+            limit=limit,
+            use_page_tokens=use_page_tokens,
+            timeout=timeout,
+            prefetch=prefetch,
+            page=page,
+            page_token=page_token,
+            item_count=item_count,
+        ):
+            yield from items
+
+    def iter_pages(
+        self,
+        url: str,
+        list_field: str,
+        get_params: dict | None = None,
+        per_page: int | None = None,
+        limit: int | None = None,
+        use_page_tokens: bool = True,
+        timeout: float | None = None,
+        prefetch: int | None = None,
+        page: int = 1,
+        page_token: str | None = None,
+        item_count: int = 0,
+        headers: dict[str, str] | None = None,
+    ) -> Iterator[list[dict]]:
+        """
+        Yields the items one page at a time, following `next_page_token` (if
+        `use_page_tokens`) and stopping once `limit` items have been yielded.
+        Each page request is retried on its own (see request()). If it still
+        fails after some pages have been yielded, the original exception is
+        raised with the attributes `page`, `page_token` and `item_count` (the
+        number of items yielded so far) added; pass them back to resume from
+        the page that failed, with `limit` still counting from the start.
+        get_list() also adds `items`, the items it got before the failure.
+
+        @param prefetch If > 0, up to this many pages are fetched in a
+        background thread while the current one is being consumed. Defaults
+        to settings.prefetch_pages.
+        """
+        prefetch = settings.prefetch_pages if prefetch is None else prefetch
+        pages = self._iter_pages(
+            url=url,
+            list_field=list_field,
+            get_params=get_params,
+            per_page=per_page,
+            limit=limit or settings.list_limit,
+            use_page_tokens=use_page_tokens,
+            timeout=timeout,
+            page=page,
+            page_token=page_token,
+            item_count=item_count,
+            headers=headers,
+        )
+        if prefetch > 0:
+            return iter_prefetched(pages, prefetch)
+        return pages
 
-    def put(self, url: str, json: dict | None = None) -> dict:
-        return self.request(url=url, method=HTTPMetod.PUT, json=json or {})
+    def post(
+        self,
+        url: str,
+        json: dict | None = None,
+        timeout: float | None = None,
+        retry: bool = False,
+        cost: float = 1,
+    ) -> dict:
+        return self.request(url=url, method=HTTPMetod.POST, json=json or {}, timeout=timeout, retry=retry, cost=cost)
 
-    def request(self, url: str, method: HTTPMetod, json: dict | None = None) -> dict:
-        def do_request(url: str) -> requests.Response:
-            response = requests.request(
+    def put(self, url: str, json: dict | None = None, timeout: float | None = None, cost: float = 1) -> dict:
+        return self.request(url=url, method=HTTPMetod.PUT, json=json or {}, timeout=timeout, cost=cost)
+
+    def request(
+        self,
+        url: str,
+        method: HTTPMetod,
+        json: dict | None = None,
+        timeout: float | None = None,
+        retry: bool | None = None,
+        headers: dict[str, str] | None = None,
+        cost: float = 1,
+    ) -> dict:
+        """
+        @param retry Whether to retry on connection errors, timeouts and 5xx
+        responses, up to settings.max_retries times with exponential backoff.
+        Defaults to True for idempotent methods (GET, PUT, DELETE) and False
+        otherwise. 429 responses are always retried (see RateLimiter).
+        @param headers Extra request headers, e.g.         response. A 304
+        response returns an empty dict, just like 204.
+        @param cost API credits the call costs, to be taken from the rate
+        limiter's budget (for every attempt, since each one is charged).
+        """
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        # Encoded once, and not on every retry:
+        body = get_json_codec().dumps(json) if json is not None else None
+        if body is not None:
+            headers = {"Content-Type": "application/json", **(headers or {})}
+
+        def send() -> requests.Response:
+            response = self.session.request(
                 method=method.value,
                 url=url,
-                headers={"Authorization": f"{self.token.token_type} {self.token.access_token}"},
-                json=json,
-                timeout=10,
+                headers={"Authorization": f"{self.token.token_type} {self.token.access_token}", **(headers or {})},
+                data=body,
+                timeout=timeout or settings.request_timeout,
             )
             logger.info(
                 "%s %s: %d%s, %d bytes",
@@ -123,9 +509,38 @@ class ZohoRequestor:
                 logger.debug("json=%s", json)
             return response
 
-        response = do_request(url=url)
+        response = self._send(method, url, send, retry, cost)
         ZohoHTTPError.raise_for_status(response)
 
-        if response.status_code == 204:
+        if response.status_code in (204, 304):
             return {}
-        return response.json()
+        return get_json_codec().loads(response.content)
+
+    def upload(
+        self,
+        url: str,
+        file: IO[bytes],
+        filename: str,
+        headers: dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> dict:
+        """
+        Multipart upload of `file` as the form field "file". Retried like
+        request() does with retry=True; `file` is rewound to where it was
+        for every attempt.
+        """
+        position = file.tell()
+
+        def send() -> requests.Response:
+            file.seek(position)
+            return self.session.post(
+                url=url,
+                headers={"Authorization": f"{self.token.token_type} {self.token.access_token}", **(headers or {})},
+                files={"file": (filename, file)},
+                timeout=timeout or settings.request_timeout,
+            )
+
+        with self._send(HTTPMetod.POST, url, send, retry=True) as response:
+            logger.info("POST %s: %d, %s uploaded", url, response.status_code, filename)
+            ZohoHTTPError.raise_for_status(response)
+            return get_json_codec().loads(response.content)
@@ -1,7 +1,18 @@
+from copy import deepcopy
 from typing import Any
 from urllib.parse import quote
 
 
+# Bulk API comparators are mostly the same as the search API operators:
+BULK_COMPARATORS = {"equals": "equal"}
+
+# Search API maximums: criteria in one search, values for one "in" criterion,
+# and records that can be paged through for one search.
+SEARCH_MAX_CRITERIA = 10
+SEARCH_MAX_IN_VALUES = 100
+SEARCH_MAX_RECORDS = 2000
+
+
 class Criterion:
     def __init__(self, key: str, operator: str, value: Any):
         self.key = key
@@ -19,6 +30,19 @@ class Criterion:
             value += "\\"
         return value
 
+    def bulk_criterion(self) -> dict:
+        return {
+            "field": {"api_name": self.key},
+            "comparator": BULK_COMPARATORS.get(self.operator, self.operator),
+            "value": self.bulk_value(),
+        }
+
+    def bulk_value(self) -> Any:
+        value = self.value
+        if isinstance(value, (list, tuple)):
+            return [v.isoformat() if hasattr(v, "isoformat") else v for v in value]
+        return value.isoformat() if hasattr(value, "isoformat") else value
+
     def escape_value(self) -> str:
         return self.escape(self.value)
 
@@ -55,11 +79,30 @@ class Search:
     def __call__(self):
         return f"({"and".join(c() for c in self._criteria)})"
 
+    @property
+    def criteria(self) -> list[Criterion]:
+        return list(self._criteria)
+
     def _add_terms(self, operator: str, **terms):
         for key, value in terms.items():
             self._criteria.append(Criterion(key=key, operator=operator, value=value))
         return self
 
+    def add(self, criterion: Criterion) -> "Search":
+        self._criteria.append(criterion)
+        return self
+
+    def bulk_criteria(self) -> dict | None:
+        """The same criteria in the JSON format used by the Bulk APIs."""
+        if not self._criteria:
+            return None
+        if len(self._criteria) == 1:
+            return self._criteria[0].bulk_criterion()
+        return {"group_operator": "and", "group": [c.bulk_criterion() for c in self._criteria]}
+
+    def copy(self) -> "Search":
+        return deepcopy(self)
+
     def eq(self, **terms):
         return self._add_terms(operator="equals", **terms)
 
@@ -95,3 +138,32 @@ class Search:
     def between(self, key: str, term1: Any, term2: Any):
         self._criteria.append(BetweenCriterion(key=key, value=(term1, term2)))
         return self
+
+    def needs_sharding(self, max_in_values: int = SEARCH_MAX_IN_VALUES) -> bool:
+        return any(isinstance(c, InCriterion) and len(c.value) > max_in_values for c in self._criteria)
+
+    def shard(self, max_in_values: int = SEARCH_MAX_IN_VALUES) -> "list[Search]":
+        """
+        Splits "in" criteria with more than `max_in_values` values into
+        several searches, which together cover the same records. With more
+        than one such criterion, every combination of their parts gets a
+        search.
+        """
+        searches = [Search()]
+
+        for criterion in self._criteria:
+            if isinstance(criterion, InCriterion) and len(criterion.value) > max_in_values:
+                parts = [
+                    InCriterion(key=criterion.key, value=criterion.value[idx:idx + max_in_values])
+                    for idx in range(0, len(criterion.value), max_in_values)
+                ]
+                sharded = []
+                for search in searches:
+                    for part in parts:
+                        sharded.append(search.copy().add(part))
+                searches = sharded
+            else:
+                for search in searches:
+                    search.add(deepcopy(criterion))
+
+        return searches
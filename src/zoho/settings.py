@@ -1,25 +1,63 @@
 import os
-from typing import Self
+from typing import TYPE_CHECKING, Self
 
 import dotenv
 
 
+if TYPE_CHECKING:
+    from zoho.cache import RecordCache
+    from zoho.json_codec import JSONCodec
+    from zoho.token_store import TokenStore
+
+
+# Needed by bulk_read() and bulk_write() (the latter uploads through
+# ZohoFiles), but only requested if settings.bulk_scopes is set:
+BULK_SCOPES = ["ZohoCRM.bulk.ALL", "ZohoFiles.files.ALL"]
+
+
 class Settings:
     _instance: Self
     _initialized: bool = False
 
     auth_code: str | None
     auth_url: str
+    bulk_poll_interval: float
+    bulk_poll_interval_max: float
+    # Whether interactive authentication also asks for BULK_SCOPES:
+    bulk_scopes: bool
     client_id: str | None
     client_secret: str | None
+    download_spool_size: int
+    # Defaults to orjson if installed, see zoho.json_codec:
+    json_codec: "JSONCodec | None"
     list_limit: int
     # Only used for the callback URL on interactive authentication:
     local_webserver_host: str
     local_webserver_port: int
+    max_concurrency: int
+    max_retries: int
+    org_id: str | None
+    pool_size: int
+    prefetch_pages: int
+    rate_limit_credits: int | None
+    rate_limit_period: float
+    rate_limit_retries: int
+    # Opt-in, see zoho.cache:
+    record_cache: "RecordCache | None"
     refresh_token: str | None
+    request_timeout: float
+    retry_backoff: float
+    retry_backoff_max: float
     scope: list[str]
+    tag_registry_ttl: float
     timezone: str
+    # Seconds before expiry at which the token is refreshed in the background:
+    token_refresh_margin: float
+    # Opt-in, see zoho.token_store:
+    token_store: "TokenStore | None"
     token_url: str
+    # Defaults to the "content" host of the token's API domain:
+    upload_url: str | None
 
     def __new__(cls):
         # Forced singleton:
@@ -31,12 +69,30 @@ class Settings:
         if not self._initialized:
             self.auth_code = os.environ.get("ZOHO_AUTH_CODE", None)
             self.auth_url = os.environ.get("ZOHO_AUTH_URL", "https://accounts.zoho.com/oauth/v2/auth")
+            self.bulk_poll_interval = float(os.environ.get("ZOHO_BULK_POLL_INTERVAL", "2"))
+            self.bulk_poll_interval_max = float(os.environ.get("ZOHO_BULK_POLL_INTERVAL_MAX", "30"))
+            self.bulk_scopes = os.environ.get("ZOHO_BULK_SCOPES", "") in ("1", "true", "True")
             self.client_id = os.environ.get("ZOHO_CLIENT_ID", None)
             self.client_secret = os.environ.get("ZOHO_CLIENT_SECRET", None)
+            self.download_spool_size = int(os.environ.get("ZOHO_DOWNLOAD_SPOOL_SIZE", str(10 * 1024 * 1024)))
+            self.json_codec = None
             self.list_limit = 200
             self.local_webserver_host = os.environ.get("ZOHO_LOCAL_WEBSERVER_HOST", "127.0.0.1")
             self.local_webserver_port = int(os.environ.get("ZOHO_LOCAL_WEBSERVER_PORT", "8888"))
+            self.max_concurrency = int(os.environ.get("ZOHO_MAX_CONCURRENCY", "10"))
+            self.max_retries = int(os.environ.get("ZOHO_MAX_RETRIES", "3"))
+            self.org_id = os.environ.get("ZOHO_ORG_ID", None)
+            self.pool_size = int(os.environ.get("ZOHO_POOL_SIZE", "10"))
+            self.prefetch_pages = int(os.environ.get("ZOHO_PREFETCH_PAGES", "0"))
+            rate_limit_credits = os.environ.get("ZOHO_RATE_LIMIT_CREDITS", None)
+            self.rate_limit_credits = int(rate_limit_credits) if rate_limit_credits else None
+            self.rate_limit_period = float(os.environ.get("ZOHO_RATE_LIMIT_PERIOD", "60"))
+            self.rate_limit_retries = int(os.environ.get("ZOHO_RATE_LIMIT_RETRIES", "5"))
+            self.record_cache = None
             self.refresh_token = os.environ.get("ZOHO_REFRESH_TOKEN", None)
+            self.request_timeout = float(os.environ.get("ZOHO_REQUEST_TIMEOUT", "10"))
+            self.retry_backoff = float(os.environ.get("ZOHO_RETRY_BACKOFF", "1"))
+            self.retry_backoff_max = float(os.environ.get("ZOHO_RETRY_BACKOFF_MAX", "30"))
             self.scope = [
                 "ZohoCRM.modules.ALL",
                 "ZohoCRM.settings.ALL",
@@ -44,8 +100,12 @@ class Settings:
                 "ZohoCRM.users.ALL",
                 "ZohoCRM.org.ALL",
             ]
+            self.tag_registry_ttl = float(os.environ.get("ZOHO_TAG_REGISTRY_TTL", "300"))
             self.timezone = os.environ.get("ZOHO_TIMEZONE", "UTC")
+            self.token_refresh_margin = float(os.environ.get("ZOHO_TOKEN_REFRESH_MARGIN", "300"))
+            self.token_store = None
             self.token_url = os.environ.get("ZOHO_TOKEN_URL", "https://accounts.zoho.eu/oauth/v2/token")
+            self.upload_url = os.environ.get("ZOHO_UPLOAD_URL", None)
             self._initialized = True
 
 
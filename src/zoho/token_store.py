@@ -0,0 +1,105 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator
+
+from zoho.oauth2 import ZohoOAuth2Token
+
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # type: ignore
+
+
+logger = logging.getLogger(__name__)
+
+
+class TokenStore(ABC):
+    """
+    Where ZohoRequestor keeps its access token, so it can be shared by
+    several requestors, processes or consecutive runs. Set
+    zoho.settings.token_store to enable.
+    """
+    @abstractmethod
+    def get(self) -> ZohoOAuth2Token | None:
+        ...
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """
+        Held while refreshing, so that only one of the processes sharing the
+        store refreshes at a time. Default is no locking.
+        """
+        yield
+
+    @abstractmethod
+    def set(self, token: ZohoOAuth2Token):
+        ...
+
+
+class MemoryTokenStore(TokenStore):
+    """Shares the token between requestors in the same process."""
+    def __init__(self):
+        self._token: ZohoOAuth2Token | None = None
+        self._lock = threading.Lock()
+
+    def get(self) -> ZohoOAuth2Token | None:
+        return self._token
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        with self._lock:
+            yield
+
+    def set(self, token: ZohoOAuth2Token):
+        self._token = token
+
+
+class FileTokenStore(TokenStore):
+    """
+    Keeps the token in a JSON file, which may be shared by several
+    processes. Refreshing is serialized with an exclusive lock on
+    `<path>.lock` (only on platforms that have fcntl, i.e. not Windows).
+    The file contains the access token, so keep it private.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def get(self) -> ZohoOAuth2Token | None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return ZohoOAuth2Token.from_dict(json.load(f))
+        except FileNotFoundError:
+            return None
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("Could not read token from %s: %s", self.path, e)
+            return None
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(f"{self.path}.lock", "a", encoding="utf-8") as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def set(self, token: ZohoOAuth2Token):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(token.to_dict(), f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -1,12 +1,143 @@
 import datetime
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
+from typing import Any, Callable, Iterable, Iterator, TypeVar
 from zoneinfo import ZoneInfo
 
 from zoho.settings import settings
 
 
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+@cache
+def _get_zoneinfo(key: str) -> ZoneInfo:
+    return ZoneInfo(key)
+
+
 def get_timezone():
-    return ZoneInfo(settings.timezone)
+    return _get_zoneinfo(settings.timezone)
 
 
 def now() -> datetime.datetime:
     return datetime.datetime.now(get_timezone())
+
+
+def map_concurrently(func: Callable[[_T], _R], items: Iterable[_T]) -> list[_R]:
+    """
+    Like list(map(func, items)), but runs on a thread pool of at most
+    settings.max_concurrency threads when there is more than one item.
+    """
+    items = list(items)
+    if len(items) < 2:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(len(items), settings.max_concurrency)) as executor:
+        return list(executor.map(func, items))
+
+
+def merge_dict_lists_by_id(dict_lists: list[list[dict[str, Any]]]) -> list[dict[str, Any]]:
+    """
+    Merges lists of partial record dicts (e.g. the same records fetched with
+    different field lists) into one dict per record, joined on "id". The
+    result is ordered by first occurrence. Rows without an id are passed
+    through as they are.
+    """
+    merged: dict[Any, dict[str, Any]] = {}
+    anonymous: list[dict[str, Any]] = []
+
+    for dict_list in dict_lists:
+        for row in dict_list:
+            if row.get("id") is None:
+                anonymous.append(row)
+            else:
+                merged.setdefault(row["id"], {}).update(row)
+
+    return list(merged.values()) + anonymous
+
+
+def iter_merged_pages_by_id(page_iterators: list[Iterator[list[dict[str, Any]]]]) -> Iterator[list[dict[str, Any]]]:
+    """
+    Streaming counterpart of merge_dict_lists_by_id(). Consumes the page
+    iterators in lockstep and yields each merged row as soon as every
+    iterator has contributed to it, so only rows whose parts are still on
+    their way are kept around. Rows that some iterator never delivered are
+    yielded last.
+    """
+    if len(page_iterators) == 1:
+        yield from page_iterators[0]
+        return
+
+    pending: dict[Any, dict[str, Any]] = {}
+    contributions: dict[Any, int] = {}
+    active = list(page_iterators)
+
+    while active:
+        done: list[dict[str, Any]] = []
+
+        for page_iterator in list(active):
+            page = next(page_iterator, None)
+            if page is None:
+                active.remove(page_iterator)
+                continue
+            for row in page:
+                row_id = row.get("id")
+                if row_id is None:
+                    done.append(row)
+                    continue
+                pending.setdefault(row_id, {}).update(row)
+                contributions[row_id] = contributions.get(row_id, 0) + 1
+                if contributions[row_id] == len(page_iterators):
+                    done.append(pending.pop(row_id))
+                    del contributions[row_id]
+
+        if done:
+            yield done
+
+    if pending:
+        yield list(pending.values())
+
+
+def iter_prefetched(iterator: Iterator[_T], depth: int) -> Iterator[_T]:
+    """
+    Runs `iterator` in a background thread, keeping up to `depth` items
+    ready ahead of the consumer, so that producing the next item (e.g.
+    fetching the next page) overlaps with consuming the current one.
+    Exceptions are re-raised in the consuming thread. If the consumer stops
+    early, the thread stops after at most one more item.
+    """
+    items: queue.Queue[tuple[bool, Any]] = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def put(item: tuple[bool, Any]) -> bool:
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce():
+        try:
+            for item in iterator:
+                if not put((False, item)):
+                    return
+            put((True, None))
+        except BaseException as e:
+            put((True, e))
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    try:
+        while True:
+            finished, item = items.get()
+            if finished:
+                if item is not None:
+                    raise item
+                return
+            yield item
+    finally:
+        stopped.set()
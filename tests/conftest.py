@@ -0,0 +1,31 @@
+import pytest
+
+from zoho.oauth2 import ZohoOAuth2Token
+from zoho.requestor import ZohoRequestor
+
+
+API_DOMAIN = "https://www.zohoapis.test"
+
+
+def make_token(expires_in: int = 3600) -> ZohoOAuth2Token:
+    return ZohoOAuth2Token(
+        {
+            "access_token": "access",
+            "api_domain": API_DOMAIN,
+            "expires_in": expires_in,
+            "token_type": "Zoho-oauthtoken",
+        },
+        refresh_token="refresh",
+    )
+
+
+@pytest.fixture
+def requestor(monkeypatch) -> ZohoRequestor:
+    """
+    A fresh ZohoRequestor.singleton() with a valid token. Tests patch the
+    methods they expect to be called; nothing here talks to the network.
+    """
+    instance = ZohoRequestor()
+    instance._token = make_token()  # pylint: disable=protected-access
+    monkeypatch.setattr(ZohoRequestor, "_instance", instance, raising=False)
+    return instance
@@ -0,0 +1,24 @@
+import asyncio
+from urllib.parse import parse_qs, urlparse
+
+from zoho.async_requestor import AsyncZohoRequestor
+
+
+def test_get_list_respects_limit(requestor, monkeypatch):  # pylint: disable=unused-argument
+    async_requestor = AsyncZohoRequestor()
+    urls = []
+
+    async def get(url, timeout=None, headers=None):  # pylint: disable=unused-argument
+        urls.append(url)
+        page = int(parse_qs(urlparse(url).query)["page"][0])
+        return {
+            "data": [{"id": str(page * 10 + i)} for i in range(4)],
+            "info": {"more_records": True},
+        }
+
+    monkeypatch.setattr(async_requestor, "get", get)
+
+    items = asyncio.run(async_requestor.get_list("https://example.test/Leads", "data", limit=6))
+
+    assert [item["id"] for item in items] == ["10", "11", "12", "13", "20", "21"]
+    assert len(urls) == 2
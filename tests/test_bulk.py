@@ -0,0 +1,161 @@
+import csv
+import io
+import threading
+import zipfile
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from zoho import Lead, Tag, ZohoException
+from zoho.bulk import iter_csv_rows
+from zoho.json_codec import get_json_codec
+from zoho.ratelimit import BULK_WRITE_COST
+from zoho.settings import settings
+
+
+def read_csv_zip(file) -> list[list[str]]:
+    with zipfile.ZipFile(file) as archive:
+        return list(csv.reader(io.TextIOWrapper(archive.open(archive.namelist()[0]), encoding="utf-8")))
+
+
+def make_csv_zip(rows: list[list[str]]) -> io.BytesIO:
+    file = io.BytesIO()
+    with zipfile.ZipFile(file, "w") as archive:
+        text = io.StringIO()
+        csv.writer(text).writerows(rows)
+        archive.writestr("result.csv", text.getvalue())
+    file.seek(0)
+    return file
+
+
+class FakeBulkReadAPI(BaseHTTPRequestHandler):
+    """
+    Stand-in for the Bulk Read API: every job is "IN PROGRESS" the first
+    time it is polled, and its result has two rows per page, up to page 2.
+    """
+    server: "FakeBulkReadServer"
+
+    def _send_json(self, data: dict):
+        self._send_body(get_json_codec().dumps(data), "application/json")
+
+    def _send_body(self, body: bytes, content_type: str):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.server.authorizations.add(self.headers["Authorization"])
+        job_id = self.path.split("/")[5]
+        page = self.server.jobs[job_id]
+        if self.path.endswith("/result"):
+            rows = [["Id", "Last_Name", "Annual_Revenue", "Owner"]]
+            rows.extend([f"{page}{idx}", f"Lead {page}{idx}", "1000.5", "9"] for idx in range(2))
+            self._send_body(make_csv_zip(rows).getvalue(), "application/zip")
+            return
+        self.server.polls[job_id] = self.server.polls.get(job_id, 0) + 1
+        job: dict = {"id": job_id, "state": "IN PROGRESS" if self.server.polls[job_id] == 1 else "COMPLETED"}
+        if job["state"] == "COMPLETED":
+            job["result"] = {"download_url": f"/crm/bulk/v5/read/{job_id}/result", "more_records": page < 2}
+        self._send_json({"data": [job]})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        query = get_json_codec().loads(self.rfile.read(int(self.headers["Content-Length"])))["query"]
+        self.server.queries.append(query)
+        job_id = f"job{len(self.server.jobs) + 1}"
+        self.server.jobs[job_id] = query["page"]
+        self._send_json({"data": [{"status": "success", "details": {"id": job_id}}]})
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+class FakeBulkReadServer(ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeBulkReadAPI)
+        self.authorizations: set[str] = set()
+        self.jobs: dict[str, int] = {}
+        self.polls: dict[str, int] = {}
+        self.queries: list[dict] = []
+
+
+@pytest.fixture
+def bulk_read_server(requestor, monkeypatch):
+    server = FakeBulkReadServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    # pylint: disable=protected-access
+    monkeypatch.setattr(requestor._token, "api_domain", f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(settings, "bulk_poll_interval", 0.01)
+    yield server
+    server.shutdown()
+    server.server_close()
+    requestor.close()
+
+
+def test_bulk_read_through_server(bulk_read_server):
+    leads = list(Lead.bulk_read(fields=["Last_Name", "Annual_Revenue", "Owner"], Last_Name="Lead"))
+
+    assert [lead.id for lead in leads] == ["10", "11", "20", "21"]
+    assert leads[0].Last_Name == "Lead 10"
+    assert leads[0].Annual_Revenue == Decimal("1000.5")
+    assert leads[0].Owner is not None and leads[0].Owner.id == "9"
+    assert [query["page"] for query in bulk_read_server.queries] == [1, 2]
+    assert bulk_read_server.queries[0]["module"] == {"api_name": "Leads"}
+    assert "criteria" in bulk_read_server.queries[0]
+    assert bulk_read_server.polls == {"job1": 2, "job2": 2}
+    assert bulk_read_server.authorizations == {"Zoho-oauthtoken access"}
+
+
+def test_bulk_write_leaves_out_tags(requestor, monkeypatch):
+    monkeypatch.setattr(settings, "org_id", "org")
+    uploaded: list[list[str]] = []
+    posted: list[dict] = []
+    costs: list[float] = []
+
+    def upload(url, file, filename, headers=None):
+        uploaded.extend(read_csv_zip(file))
+        return {"details": {"file_id": "file"}}
+
+    def post(url, json=None, timeout=None, retry=False, cost=1):
+        posted.append(json)
+        costs.append(cost)
+        return {"details": {"id": "job"}}
+
+    def get(url, timeout=None, headers=None):
+        return {"id": "job", "status": "COMPLETED", "result": {"download_url": "/result"}}
+
+    def download(url):
+        return make_csv_zip([["ID", "STATUS"], ["1", "UPDATED"], ["2", "UPDATED"], ["3", "ADDED"]])
+
+    monkeypatch.setattr(requestor, "upload", upload)
+    monkeypatch.setattr(requestor, "post", post)
+    monkeypatch.setattr(requestor, "get", get)
+    monkeypatch.setattr(requestor, "download", download)
+
+    leads = [
+        Lead(id="1", Last_Name="Anna"),
+        Lead(id="2", Last_Name="Bo", Tag=[Tag(id="77", name="vip")]),
+        Lead(id=None, Last_Name="Cecilia", Tag=[]),
+    ]
+    results = Lead.bulk_write(leads)
+
+    assert [result.ok for result in results] == [True, True, True]
+    assert "Tag" not in uploaded[0]
+    assert all("77" not in row for row in uploaded)
+    mapped = [mapping["api_name"] for mapping in posted[0]["resource"][0]["field_mappings"]]
+    assert mapped == uploaded[0]
+    assert "Tag" not in mapped
+    assert costs == [BULK_WRITE_COST]
+
+
+def test_iter_csv_rows_without_csv():
+    file = io.BytesIO()
+    with zipfile.ZipFile(file, "w") as archive:
+        archive.writestr("readme.txt", "nothing here")
+    file.seek(0)
+
+    with pytest.raises(ZohoException, match="No CSV file"):
+        list(iter_csv_rows(file))
@@ -0,0 +1,97 @@
+import pytest
+
+from zoho import Lead
+from zoho.cache import MemoryRecordCache, RecordCache, SQLiteRecordCache
+from zoho.settings import settings
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr("zoho.cache.time.time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    caches: list[RecordCache] = []
+
+    def make(**kwargs) -> RecordCache:
+        if request.param == "memory":
+            cache: RecordCache = MemoryRecordCache(**kwargs)
+        else:
+            cache = SQLiteRecordCache(str(tmp_path / f"cache{len(caches)}.sqlite3"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        if isinstance(cache, SQLiteRecordCache):
+            cache.close()
+
+
+def test_entries_expire_after_ttl(make_cache, clock):
+    cache = make_cache(ttl=60)
+    cache.set("Leads", "1", {"id": "1"})
+
+    clock.now += 59
+    assert cache.get("Leads", "1") == {"id": "1"}
+    clock.now += 2
+    assert cache.get("Leads", "1") is None
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+
+def test_no_ttl_never_expires(make_cache, clock):
+    cache = make_cache(ttl=None)
+    cache.set("Leads", "1", {"id": "1"})
+
+    clock.now += 10 ** 9
+    assert cache.get("Leads", "1") == {"id": "1"}
+
+
+def test_least_recently_used_is_evicted(make_cache, clock):
+    cache = make_cache(max_size=2)
+    cache.set("Leads", "1", {"id": "1"})
+    clock.now += 1
+    cache.set("Leads", "2", {"id": "2"})
+    clock.now += 1
+    assert cache.get("Leads", "1") is not None
+    clock.now += 1
+    cache.set("Leads", "3", {"id": "3"})
+
+    assert cache.get("Leads", "2") is None
+    assert cache.get("Leads", "1") is not None
+    assert cache.get("Leads", "3") is not None
+    assert cache.stats.evictions == 1
+
+
+def test_get_uses_cache_until_update(requestor, monkeypatch):
+    monkeypatch.setattr(settings, "record_cache", MemoryRecordCache())
+    fetched: list[str] = []
+
+    def get(url, timeout=None, headers=None):  # pylint: disable=unused-argument
+        fetched.append(url)
+        return {"data": [{"id": "1", "Last_Name": f"Anna {len(fetched)}"}]}
+
+    monkeypatch.setattr(requestor, "get", get)
+    monkeypatch.setattr(requestor, "put", lambda url, json=None, timeout=None, cost=1: {})
+
+    lead = Lead.get("1")
+    assert lead is not None
+    lead.Last_Name = "Changed locally"
+    cached = Lead.get("1")
+    assert cached is not None and cached.Last_Name == "Anna 1"
+    assert len(fetched) == 1
+
+    lead.update()
+    updated = Lead.get("1")
+    assert updated is not None and updated.Last_Name == "Anna 2"
+    assert len(fetched) == 2
@@ -0,0 +1,69 @@
+from zoho import Lead
+from zoho.dedupe import Deduper
+from zoho.records.result import BulkResult
+
+
+def make_lead(idx: int, **values) -> Lead:
+    return Lead.from_dict({"id": str(idx), "Last_Name": f"Lead {idx}", **values})
+
+
+def get_group_ids(groups: list[list[Lead]]) -> list[list[str | None]]:
+    return sorted(sorted(lead.id for lead in group) for group in groups)
+
+
+def test_duplicates_are_transitive():
+    leads = [
+        make_lead(1, Email="Anna@Example.com"),
+        make_lead(2, Secondary_Email="anna@example.com", Company="ACME AB", Phone="070-123 45 67"),
+        make_lead(3, Company="Acme ab", Mobile="+46 70 123 45 67"),
+        make_lead(4, Email="bertil@example.com"),
+    ]
+
+    assert get_group_ids(Deduper(Lead).find_groups(leads)) == [["1", "2", "3"]]
+
+
+def test_insufficient_key_alone_is_not_a_duplicate():
+    leads = [
+        make_lead(1, Company="ACME AB", Phone="070-123 45 67"),
+        make_lead(2, Company="ACME AB", Phone="070-765 43 21"),
+        make_lead(3, Company="Other AB", Phone="070-123 45 67"),
+    ]
+
+    assert not Deduper(Lead).find_groups(leads)
+
+
+def test_max_block_size_only_applies_to_insufficient_keys():
+    same_email = [make_lead(idx, Email="info@example.com") for idx in range(10)]
+    same_company_and_phone = [make_lead(idx, Company="ACME AB", Phone="070-123 45 67") for idx in range(10, 20)]
+
+    groups = Deduper(Lead, max_block_size=5).find_groups(same_email + same_company_and_phone)
+
+    assert get_group_ids(groups) == [sorted(str(idx) for idx in range(10))]
+
+
+def test_apply_deletes_losers_of_updated_survivors(monkeypatch):
+    leads = [
+        make_lead(1, Email="anna@example.com", Created_Time="2024-01-01T00:00:00+00:00"),
+        make_lead(2, Email="anna@example.com", Created_Time="2024-02-01T00:00:00+00:00", Phone="070-123 45 67"),
+        make_lead(3, Email="bertil@example.com", Created_Time="2024-01-01T00:00:00+00:00"),
+        make_lead(4, Email="bertil@example.com", Created_Time="2024-02-01T00:00:00+00:00"),
+    ]
+    deleted: list[Lead] = []
+
+    def bulk_update(records):
+        return [BulkResult(record=record, status="success" if record.id == "1" else "error") for record in records]
+
+    def bulk_delete(records):
+        deleted.extend(records)
+        return [BulkResult(record=record, status="success") for record in records]
+
+    monkeypatch.setattr(Lead, "bulk_update", bulk_update)
+    monkeypatch.setattr(Lead, "bulk_delete", bulk_delete)
+
+    result = Deduper(Lead).run(leads)
+    update_results, delete_results = result.apply(Lead)
+
+    assert [r.record.id for r in update_results] == ["1", "3"]
+    assert result.survivors[0].Phone == "070-123 45 67"
+    assert [lead.id for lead in deleted] == ["2"]
+    assert [r.record.id for r in delete_results] == ["2"]
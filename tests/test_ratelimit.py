@@ -0,0 +1,66 @@
+# pylint: disable=protected-access
+import requests
+
+from zoho.ratelimit import RateLimiter, get_coql_cost, get_record_write_cost
+from zoho.settings import settings
+
+
+def test_budget_is_spent_by_cost():
+    limiter = RateLimiter(budget=10, period=60)
+
+    assert limiter._get_delay(4) == 0
+    assert limiter._get_delay(4) == 0
+    # 2 credits left, and 1 comes back every 6 seconds:
+    assert 11.9 < limiter._get_delay(4) <= 12
+
+
+def test_cost_over_budget_waits_for_full_bucket():
+    limiter = RateLimiter(budget=10, period=60)
+    assert limiter._get_delay(1) == 0
+    assert 0 < limiter._get_delay(500) <= 6
+
+    limiter._available = 10
+    assert limiter._get_delay(500) == 0
+    assert limiter._get_delay(1) > 0
+
+
+def test_no_budget_never_waits():
+    limiter = RateLimiter()
+
+    assert limiter._get_delay(500) == 0
+    limiter.block(5)
+    assert 4 < limiter._get_delay(1) <= 5
+
+
+def test_from_settings(monkeypatch):
+    monkeypatch.setattr(settings, "rate_limit_credits", 25)
+
+    assert RateLimiter.from_settings().budget == 25
+
+
+def test_costs():
+    assert [get_coql_cost(limit) for limit in (1, 200, 201, 1000, 1001, 2000)] == [1, 1, 2, 2, 3, 3]
+    assert [get_record_write_cost(count) for count in (0, 1, 10, 11, 100)] == [1, 1, 1, 2, 10]
+
+
+def test_request_charges_cost(requestor, monkeypatch):
+    costs: list[float] = []
+    acquire = requestor.rate_limiter.acquire
+
+    def record_acquire(cost=1):
+        costs.append(cost)
+        return acquire(cost)
+
+    def send_request(**kwargs):  # pylint: disable=unused-argument
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"data": []}'
+        return response
+
+    monkeypatch.setattr(requestor.rate_limiter, "acquire", record_acquire)
+    monkeypatch.setattr(requestor.session, "request", send_request)
+
+    requestor.post("https://example.test/coql", json={"select_query": "..."}, cost=3)
+    requestor.get("https://example.test/Leads")
+
+    assert costs == [3, 1]
@@ -0,0 +1,70 @@
+import os
+import pickle
+import subprocess
+import sys
+from pathlib import Path
+
+import zoho
+from zoho import Lead, Tag
+
+
+ROW = {
+    "id": "1",
+    "Last_Name": "Anna",
+    "Email": "anna@example.com",
+    "Annual_Revenue": 1000.5,
+    "Created_Time": "2024-01-02T10:11:12+05:00",
+    "Created_By": {"id": "9", "name": "Owner", "email": "owner@example.com"},
+    "Tag": [{"id": "77", "name": "vip"}],
+}
+
+
+def test_pickle_compact_record():
+    record = Lead.compact_class().from_dict(ROW)
+
+    restored = pickle.loads(pickle.dumps(record))
+
+    assert type(restored) is Lead.compact_class()
+    assert type(restored.Created_By) is type(record.Created_By)
+    assert restored.to_dict() == record.to_dict()
+
+
+def test_pickle_lazy_record():
+    record = Lead.lazy_class().from_dict(ROW)
+    assert record.Email == "anna@example.com"
+
+    restored = pickle.loads(pickle.dumps(record))
+
+    assert type(restored) is Lead.lazy_class()
+    assert restored.Last_Name == "Anna"
+    assert restored.to_dict() == Lead.from_dict(ROW).to_dict()
+
+
+def test_unpickle_in_new_process():
+    """The generated classes don't have to exist yet where unpickling."""
+    data = pickle.dumps([Lead.compact_class().from_dict(ROW), Lead.lazy_class().from_dict(ROW)])
+    code = "import pickle, sys; print([r.Last_Name for r in pickle.loads(sys.stdin.buffer.read())])"
+
+    env = {**os.environ, "PYTHONPATH": str(Path(zoho.__file__).parents[1])}
+
+    output = subprocess.run([sys.executable, "-c", code], input=data, capture_output=True, check=True, env=env)
+
+    assert output.stdout.strip() == b"['Anna', 'Anna']"
+
+
+def test_equality_across_generated_classes():
+    eager = Lead.from_dict(ROW)
+    other = Lead.from_dict({**ROW, "id": "2"})
+
+    for record in (Lead.lazy_class().from_dict(ROW), Lead.compact_class().from_dict(ROW)):
+        assert record == eager
+        assert eager == record
+        assert record != other
+        assert other != record
+
+
+def test_generated_tags_stay_hashable():
+    tag = Tag.lazy_class().from_dict({"id": "77", "name": "vip"})
+
+    assert hash(tag) == hash(Tag(id="77", name="vip"))
+    assert tag in {Tag(id="77", name="vip")}
@@ -0,0 +1,110 @@
+import datetime
+import re
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from zoho import Lead, Search
+from zoho.search import SEARCH_MAX_CRITERIA, SEARCH_MAX_RECORDS
+
+
+START = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class FakeSearchAPI:
+    """
+    Stand-in for the search endpoint: supports the equals, in and between
+    operators, and enforces the API's cap on the records one search can
+    page through, and on values per "in" criterion.
+    """
+    def __init__(self, count: int):
+        self.rows = [
+            {
+                "id": str(idx),
+                "Last_Name": f"Lead {idx}",
+                "Email": f"lead{idx}@example.com",
+                "Company": "Even" if idx % 2 == 0 else "Odd",
+                "Created_Time": (START + datetime.timedelta(hours=idx)).isoformat(),
+            }
+            for idx in range(count)
+        ]
+        self.requested_records = 0
+
+    def get(self, url: str, timeout=None, headers=None) -> dict:
+        query = parse_qs(urlparse(url).query)
+        rows = self.rows
+        for key, operator, value in re.findall(r"\((\w+):(\w+):([^()]*)\)", query.get("criteria", [""])[0]):
+            values = [v.replace("\\,", ",") for v in re.split(r"(?<!\\),", value)]
+            if operator == "equals":
+                rows = [row for row in rows if row[key] == values[0]]
+            elif operator == "in":
+                assert len(values) <= 100
+                rows = [row for row in rows if row[key] in set(values)]
+            elif operator == "between":
+                start, end = (datetime.datetime.fromisoformat(v) for v in values)
+                rows = [row for row in rows if start <= datetime.datetime.fromisoformat(row[key]) <= end]
+        page, per_page = int(query["page"][0]), int(query["per_page"][0])
+        assert page * per_page <= SEARCH_MAX_RECORDS
+        self.requested_records += per_page
+        fields = ["id", *query["fields"][0].split(",")]
+        return {
+            "data": [{k: row[k] for k in fields if k in row} for row in rows[(page - 1) * per_page:page * per_page]],
+            "info": {"more_records": page * per_page < len(rows)},
+        }
+
+
+@pytest.fixture
+def api(requestor, monkeypatch) -> FakeSearchAPI:
+    fake = FakeSearchAPI(5000)
+    monkeypatch.setattr(requestor, "get", fake.get)
+    return fake
+
+
+def test_sharded_in_search_returns_all_matches_by_default(api):
+    emails = [f"lead{idx}@example.com" for idx in range(0, 5000, 2)]
+
+    leads = Lead.list(Email=emails)
+
+    assert len(leads) == 2500
+    assert len({lead.id for lead in leads}) == 2500
+
+
+def test_time_split_search(api):
+    leads = Lead.list(search=Search(Company="Even"), limit=10_000)
+
+    assert sorted(int(lead.id) for lead in leads) == list(range(0, 5000, 2))
+
+
+def test_sharded_search_respects_limit(api):
+    emails = [f"lead{idx}@example.com" for idx in range(5000)]
+
+    leads = Lead.list(Email=emails, limit=150)
+
+    assert len(leads) == 150
+    # The windows are only asked for the rows still missing, not 2000 each:
+    assert api.requested_records < 50 * 200
+
+
+def test_iter_shards_like_list(api):
+    emails = [f"lead{idx}@example.com" for idx in range(0, 5000, 2)]
+
+    assert len({lead.id for lead in Lead.iter(Email=emails)}) == 2500
+    assert len(list(Lead.iter(search=Search(Company="Even"), limit=2100))) == 2100
+
+
+def test_time_split_with_full_criteria(api):
+    search = Search(Company="Even")
+    for idx in range(SEARCH_MAX_CRITERIA - 1):
+        search.ne(Last_Name=f"Nobody {idx}")
+
+    with pytest.raises(ValueError, match="cannot be split"):
+        Lead.list(search=search, limit=10_000)
+
+
+def test_shard_splits_in_criteria():
+    search = Search(Company="Even").in_(Email=[str(idx) for idx in range(250)])
+
+    shards = search.shard()
+
+    assert [len(shard.criteria) for shard in shards] == [2, 2, 2]
+    assert [len(shard.criteria[1].value) for shard in shards] == [100, 100, 50]
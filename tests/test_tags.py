@@ -0,0 +1,23 @@
+from zoho import Lead, Tag
+
+
+def test_bulk_add_tags_skips_records_without_id(requestor, monkeypatch):
+    posted: list[dict] = []
+
+    def post(url, json=None, timeout=None, retry=False):
+        posted.append(json)
+        return {"data": [{"status": "success", "code": "SUCCESS", "details": {"id": i}} for i in json["ids"]]}
+
+    monkeypatch.setattr(requestor, "post", post)
+    leads = [Lead(id="1", Last_Name="Anna"), Lead(id=None, Last_Name="Bo"), Lead(id="3", Last_Name="Cecilia")]
+
+    results = Lead.bulk_add_tags(leads, [Tag(id=None, name="vip")])
+
+    assert posted[0]["ids"] == ["1", "3"]
+    assert [(result.record.Last_Name, result.ok) for result in results] == [
+        ("Anna", True),
+        ("Bo", False),
+        ("Cecilia", True),
+    ]
+    assert [tag.name for tag in leads[0].Tag] == ["vip"]
+    assert not leads[1].Tag
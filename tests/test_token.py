@@ -0,0 +1,94 @@
+# pylint: disable=protected-access
+import asyncio
+import threading
+import time
+
+import pytest
+
+from zoho.async_requestor import AsyncZohoRequestor
+from zoho.settings import settings
+from zoho.token_store import MemoryTokenStore
+
+from conftest import make_token
+
+
+@pytest.fixture
+def fetches(requestor, monkeypatch) -> list[str]:
+    """
+    Makes the requestor's token fetches slow, and records the access token
+    of every one of them.
+    """
+    fetched: list[str] = []
+
+    def fetch_token():
+        time.sleep(0.1)
+        fetched.append(f"access-{len(fetched) + 1}")
+        token = make_token()
+        token.access_token = fetched[-1]
+        return token
+
+    monkeypatch.setattr(requestor, "_fetch_token", fetch_token)
+    monkeypatch.setattr(settings, "token_store", None)
+    return fetched
+
+
+def test_expired_token_is_refreshed_once(requestor, fetches):
+    requestor._token = make_token(expires_in=-10)
+    tokens = []
+    threads = [threading.Thread(target=lambda: tokens.append(requestor.token)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert fetches == ["access-1"]
+    assert {token.access_token for token in tokens} == {"access-1"}
+
+
+def test_token_is_refreshed_in_background(requestor, fetches):
+    requestor._token = make_token(expires_in=int(settings.token_refresh_margin / 2))
+
+    # Doesn't wait for the refresh:
+    assert requestor.token.access_token == "access"
+    assert requestor.token.access_token == "access"
+    requestor._refresh_thread.join()
+    assert fetches == ["access-1"]
+    assert requestor.token.access_token == "access-1"
+
+
+def test_token_store_is_shared(requestor, fetches, monkeypatch):
+    store = MemoryTokenStore()
+    stored = make_token()
+    stored.access_token = "stored"
+    store.set(stored)
+    monkeypatch.setattr(settings, "token_store", store)
+    requestor._token = make_token(expires_in=-10)
+
+    assert requestor.token.access_token == "stored"
+    assert not fetches
+
+
+def test_async_token_is_refreshed_once(requestor, fetches, monkeypatch):
+    monkeypatch.setattr(AsyncZohoRequestor, "_instance", AsyncZohoRequestor(), raising=False)
+    requestor._token = make_token(expires_in=-10)
+
+    async def get_tokens():
+        return await asyncio.gather(*(AsyncZohoRequestor.singleton().get_token() for _ in range(8)))
+
+    tokens = asyncio.run(get_tokens())
+
+    assert fetches == ["access-1"]
+    assert {token.access_token for token in tokens} == {"access-1"}
+    # Sync callers get the same token:
+    assert requestor.token.access_token == "access-1"
+
+
+def test_async_token_is_refreshed_in_background(requestor, fetches, monkeypatch):
+    monkeypatch.setattr(AsyncZohoRequestor, "_instance", AsyncZohoRequestor(), raising=False)
+    requestor._token = make_token(expires_in=int(settings.token_refresh_margin / 2))
+
+    token = asyncio.run(AsyncZohoRequestor.singleton().get_token())
+
+    assert token.access_token == "access"
+    requestor._refresh_thread.join()
+    assert fetches == ["access-1"]